@@ -1,23 +1,25 @@
-# Banker's Algorithm (1 resource type)
+# Banker's Algorithm (1 or more resource types)
+import numpy as np
+
 
 class Banker:
     @staticmethod
-    def is_safe(allocation, maximum, available):
+    def is_safe(allocation, maximum, available, trace=True):
         n = len(allocation)
         if n == 0:
             return [], False, []
 
-        for row in allocation:
-            if len(row) != 1:
-                raise ValueError("Allocation must contain 1 resource per process.")
-        for row in maximum:
-            if len(row) != 1:
-                raise ValueError("Maximum must contain 1 resource per process.")
-        if len(available) != 1:
-            raise ValueError("Available must be a list of length 1.")
+        m = Banker._check(allocation, maximum, available)
 
-        need = [[maximum[i][0] - allocation[i][0]] for i in range(n)]
-        work = [available[0]]
+        if not trace:
+            if m == 1:
+                safe, sequence = Banker._greedy(allocation, maximum, available)
+            else:
+                safe, sequence = Banker._rounds(allocation, maximum, available)
+            return [], safe, sequence
+
+        need = [[maximum[i][r] - allocation[i][r] for r in range(m)] for i in range(n)]
+        work = list(available)
         finished = [False] * n
         steps = []
         sequence = []
@@ -29,20 +31,21 @@ class Banker:
                 if finished[i]:
                     continue
 
-                before = work[0]
-                can = need[i][0] <= work[0]
+                before = list(work)
+                can = all(need[i][r] <= work[r] for r in range(m))
 
                 entry = {
                     "process": i,
                     "need": need[i],
-                    "available_before": [before],
+                    "available_before": before,
                     "can_run": can,
                     "allocation": allocation[i],
                 }
 
                 if can:
-                    work[0] += allocation[i][0]
-                    entry["work_after"] = [work[0]]
+                    for r in range(m):
+                        work[r] += allocation[i][r]
+                    entry["work_after"] = list(work)
                     finished[i] = True
                     sequence.append(i)
                     changed = True
@@ -51,3 +54,112 @@ class Banker:
 
         safe = all(finished)
         return steps, safe, sequence
+
+    # Fast path (trace=False): with one resource type, work only grows, so
+    # running processes in order of need finishes every process that can
+    # finish at all; the first need above work ends the run. O(n log n),
+    # or O(n) when needs are small integers and can be bucketed. The
+    # sequence is a valid safe order (by need, ties by index) but not the
+    # pass-by-pass order of the traced run; no steps are recorded.
+    @staticmethod
+    def _greedy(allocation, maximum, available):
+        n = len(allocation)
+        need = [maximum[i][0] - allocation[i][0] for i in range(n)]
+        work = available[0]
+        sequence = []
+
+        for i in Banker._by_need(need):
+            if need[i] > work:
+                break
+            work += allocation[i][0]
+            sequence.append(i)
+
+        return len(sequence) == n, sequence
+
+    @staticmethod
+    def _by_need(need):
+        lo = min(need)
+        hi = max(need)
+        if all(type(x) is int for x in need) and hi - lo <= 4 * len(need):
+            buckets = [[] for _ in range(hi - lo + 1)]
+            for i, x in enumerate(need):
+                buckets[x - lo].append(i)
+            return [i for bucket in buckets for i in bucket]
+        return sorted(range(len(need)), key=need.__getitem__)
+
+    # Every process needs one entry per resource type in available
+    @staticmethod
+    def _check(allocation, maximum, available):
+        m = len(available)
+        if m == 0:
+            raise ValueError("Available must list at least 1 resource.")
+        if len(maximum) != len(allocation):
+            raise ValueError("Allocation and Maximum must have a row per process.")
+        for row in allocation:
+            if len(row) != m:
+                raise ValueError("Allocation must contain %d resource(s) per process." % m)
+        for row in maximum:
+            if len(row) != m:
+                raise ValueError("Maximum must contain %d resource(s) per process." % m)
+        return m
+
+    # Fast path for m resource types: need/allocation/work are NumPy
+    # arrays and each round finishes, in one vectorized comparison, every
+    # waiting process whose whole need row fits in work. They can run in
+    # any order (work only grows), so the sequence lists each round in
+    # index order. Stops when a round finishes nothing.
+    @staticmethod
+    def _rounds(allocation, maximum, available):
+        alloc = np.asarray(allocation)
+        need = np.asarray(maximum) - alloc
+        avail = np.asarray(available)
+        work = avail.astype(np.result_type(alloc.dtype, avail.dtype))
+        waiting = np.arange(len(alloc))
+        sequence = []
+
+        while len(waiting):
+            ok = (need[waiting] <= work).all(axis=1)
+            if not ok.any():
+                break
+            done = waiting[ok]
+            work += alloc[done].sum(axis=0)
+            sequence.extend(done.tolist())
+            waiting = waiting[~ok]
+
+        return len(waiting) == 0, sequence
+
+    # Resource-request algorithm: process pid asks for req (one entry per
+    # resource type). A request above the process's remaining claim is an
+    # error; one above available, or one that would leave the state
+    # unsafe, is not granted. Returns (granted, allocation, available) as
+    # new NumPy arrays: the updated state if granted, else a copy of the
+    # current one.
+    @staticmethod
+    def request(allocation, maximum, available, pid, req):
+        Banker._check(allocation, maximum, available)
+        if not 0 <= pid < len(allocation):
+            raise ValueError("Unknown process.")
+        alloc = np.array(allocation)
+        maxi = np.asarray(maximum)
+        avail = np.array(available)
+        req = np.asarray(req)
+        if req.shape != avail.shape:
+            raise ValueError("Request must contain %d resource(s)." % len(avail))
+        for have in (alloc, avail):
+            if not np.can_cast(req.dtype, have.dtype, casting="same_kind"):
+                raise ValueError("Request must use the same number type as Allocation and Available.")
+        if (req < 0).any():
+            raise ValueError("Request must be >= 0.")
+        if (req > maxi[pid] - alloc[pid]).any():
+            raise ValueError("Request exceeds the process's maximum claim.")
+        if (req > avail).any():
+            return False, alloc, avail
+
+        new_alloc = alloc.copy()
+        new_avail = avail.copy()
+        new_alloc[pid] += req
+        new_avail -= req
+        _, safe, _ = Banker.is_safe(new_alloc, maxi, new_avail, trace=False)
+        if not safe:
+            return False, alloc, avail
+        return True, new_alloc, new_avail
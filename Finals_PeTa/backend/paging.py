@@ -1,147 +1,1245 @@
-# Page Replacement Algorithms (FIFO, LRU, Optimal)
-from collections import deque
+# Page Replacement Algorithms (FIFO, LRU, Optimal, CLOCK, Second-Chance, LFU, ARC, 2Q)
+from array import array
+from bisect import bisect_right
+from collections import OrderedDict, deque
+from collections.abc import Sequence
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+import heapq
+import mmap
+import os
+
+import numpy as np
+
+
+class StepLog(Sequence):
+    # Compact record of a run: one (time, slot, evicted, inserted) entry per
+    # fault plus a hit bitmap, instead of a frame snapshot per reference.
+    # Indexing and iterating rebuild the old step dicts on demand
+    # ({"ref", "time", "frames", "page_fault"}), so list(log) is exactly
+    # the old steps list. A full frame snapshot is kept every `every`
+    # faults so a random step costs O(frames) to rebuild.
+    def __init__(self, refs, frames):
+        self.refs = refs
+        self.frames = frames
+        self.hits = bytearray((len(refs) + 7) // 8)
+        self.fault_time = array("q")
+        self.fault_slot = array("q")
+        self.evicted = array("q")
+        self.inserted = array("q")
+        self.every = max(frames, 32)
+        self._checkpoints = [[-1] * frames]
+        self._current = [-1] * frames
+
+    def hit(self, t):
+        self.hits[t >> 3] |= 1 << (t & 7)
+
+    def fault(self, t, slot, evicted, page):
+        self.fault_time.append(t)
+        self.fault_slot.append(slot)
+        try:
+            self.evicted.append(evicted)
+            self.inserted.append(page)
+        except (TypeError, OverflowError):
+            # Pages that are not 64-bit ints: keep these columns as lists
+            n = len(self.fault_slot) - 1
+            self.evicted = list(self.evicted[:n]) + [evicted]
+            self.inserted = list(self.inserted[:n]) + [page]
+        self._current[slot] = page
+        if len(self.fault_time) % self.every == 0:
+            self._checkpoints.append(list(self._current))
+
+    def is_hit(self, t):
+        return bool(self.hits[t >> 3] >> (t & 7) & 1)
+
+    def frames_at(self, t):
+        # Frame contents right after reference t
+        j = bisect_right(self.fault_time, t)
+        c = j // self.every
+        frames = list(self._checkpoints[c])
+        slots = self.fault_slot
+        pages = self.inserted
+        for k in range(c * self.every, j):
+            frames[slots[k]] = pages[k]
+        return frames
+
+    def __len__(self):
+        return len(self.refs)
+
+    def __getitem__(self, t):
+        if isinstance(t, slice):
+            return [self[i] for i in range(*t.indices(len(self)))]
+        if t < 0:
+            t += len(self)
+        if not 0 <= t < len(self):
+            raise IndexError("step index out of range")
+        return {
+            "ref": self.refs[t],
+            "time": t,
+            "frames": self.frames_at(t),
+            "page_fault": not self.is_hit(t),
+        }
+
+    def __iter__(self):
+        frames = [-1] * self.frames
+        k = 0
+        for t, page in enumerate(self.refs):
+            fault = not self.is_hit(t)
+            if fault:
+                frames[self.fault_slot[k]] = self.inserted[k]
+                k += 1
+            yield {"ref": page, "time": t, "frames": list(frames), "page_fault": fault}
+
+    def __eq__(self, other):
+        if isinstance(other, (StepLog, list)):
+            return list(self) == list(other)
+        return NotImplemented
+
+    def to_list(self):
+        return list(self)
+
+
+class FaultBitmap:
+    # Recorder for detail="faults": bit t (LSB first) is set when
+    # reference t faulted
+    def __init__(self, n):
+        self.bits = bytearray((n + 7) // 8)
+
+    def fault(self, t, slot, evicted, page):
+        self.bits[t >> 3] |= 1 << (t & 7)
+
+
+class TraceFile(Sequence):
+    # Binary reference trace, memory-mapped read-only. Entries are
+    # fixed-width native-endian integers (dtype int32/int64/uint32/uint64).
+    # Without page_size the entries are page numbers and the engines read
+    # them straight out of the mapping through a memoryview (zero copy).
+    # With page_size the entries are virtual addresses; they are turned
+    # into page numbers on the fly, `chunk` entries at a time when
+    # iterating, so only one chunk is ever materialized.
+    FORMATS = {"int32": "i", "int64": "q", "uint32": "I", "uint64": "Q"}
+
+    def __init__(self, path, dtype="int64", page_size=None, chunk=1 << 16):
+        if dtype not in TraceFile.FORMATS:
+            raise ValueError("dtype must be one of " + ", ".join(TraceFile.FORMATS))
+        if page_size is not None and page_size <= 0:
+            raise ValueError("page_size must be > 0")
+        if chunk <= 0:
+            raise ValueError("chunk must be > 0")
+        self.path = path
+        self.dtype = dtype
+        self.page_size = page_size
+        self.chunk = chunk
+
+        with open(path, "rb") as fh:
+            size = os.fstat(fh.fileno()).st_size
+            width = np.dtype(dtype).itemsize
+            if size % width:
+                raise ValueError("trace size is not a multiple of the entry width")
+            self._mm = mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ) if size else None
+        self.view = memoryview(self._mm if self._mm is not None else b"").cast(
+            TraceFile.FORMATS[dtype]
+        )
+
+        # Power-of-two page sizes convert with a shift
+        self._shift = None
+        if page_size is not None and page_size & (page_size - 1) == 0:
+            self._shift = page_size.bit_length() - 1
+
+    def __len__(self):
+        return len(self.view)
+
+    def _page(self, value):
+        if self._shift is not None:
+            return value >> self._shift
+        return value // self.page_size
+
+    def __getitem__(self, i):
+        if self.page_size is None:
+            return self.view[i]
+        if isinstance(i, slice):
+            return [self._page(v) for v in self.view[i]]
+        return self._page(self.view[i])
+
+    def __iter__(self):
+        if self.page_size is None:
+            return iter(self.view)
+        return self._pages()
+
+    def _pages(self):
+        data = np.frombuffer(self.view, dtype=self.dtype)
+        scalar = data.dtype.type
+        for start in range(0, len(data), self.chunk):
+            block = data[start:start + self.chunk]
+            if self._shift is not None:
+                block = block >> scalar(self._shift)
+            else:
+                block = block // scalar(self.page_size)
+            yield from block.tolist()
+
+    def close(self):
+        self.view.release()
+        if self._mm is not None:
+            self._mm.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
 
 
 class PageReplacement:
+    # detail levels for simulate() and the engines:
+    #   "counts"  page_faults / page_hits only, nothing kept per reference
+    #   "faults"  counts plus "fault_bitmap"
+    #   "steps"   counts plus "references" and the full "steps" log
+    DETAILS = ("counts", "faults", "steps")
+
+    # Reference strings every engine accepts
+    @staticmethod
+    def _check_refs(rs):
+        if not isinstance(rs, (list, tuple, array, TraceFile)):
+            raise ValueError("reference_string must be a list or TraceFile")
+
     @staticmethod
     def _validate(rs, frames):
-        if not isinstance(rs, (list, tuple)):
-            raise ValueError("reference_string must be a list")
+        PageReplacement._check_refs(rs)
         if frames <= 0:
             raise ValueError("num_frames must be > 0")
 
     @staticmethod
-    def simulate(refs, frames, algo):
+    def simulate(refs, frames, algo, detail="steps"):
         PageReplacement._validate(refs, frames)
-        algo = algo.upper()
+        algo = algo.upper().replace("-", "_")
         if algo == "FIFO":
-            return PageReplacement.fifo(refs, frames)
+            return PageReplacement.fifo(refs, frames, detail)
         if algo == "LRU":
-            return PageReplacement.lru(refs, frames)
+            return PageReplacement.lru(refs, frames, detail)
         if algo == "OPTIMAL":
-            return PageReplacement.optimal(refs, frames)
+            return PageReplacement.optimal(refs, frames, detail)
+        if algo == "CLOCK":
+            return PageReplacement.clock(refs, frames, detail)
+        if algo == "SECOND_CHANCE":
+            return PageReplacement.second_chance(refs, frames, detail)
+        if algo == "LFU":
+            return PageReplacement.lfu(refs, frames, detail)
+        if algo == "ARC":
+            return PageReplacement.arc(refs, frames, detail)
+        if algo == "2Q":
+            return PageReplacement.two_q(refs, frames, detail)
         raise ValueError("Unknown algorithm.")
+
+    # Online simulator for a live reference stream (see OnlinePager)
+    @staticmethod
+    def online(frames, algo, window=1000):
+        algo = algo.upper().replace("-", "_")
+        pagers = {
+            "FIFO": FIFOPager,
+            "LRU": LRUPager,
+            "CLOCK": ClockPager,
+            "SECOND_CHANCE": ClockPager,
+            "LFU": LFUPager,
+            "ARC": ARCPager,
+            "2Q": TwoQPager,
+        }
+        if algo not in pagers:
+            raise ValueError("Unknown algorithm.")
+        return pagers[algo](frames, window)
+
+    # Returns (log, hit, fault); hit/fault are None when not recorded
+    @staticmethod
+    def _recorder(refs, f, detail):
+        if detail == "steps":
+            log = StepLog(refs, f)
+            return log, log.hit, log.fault
+        if detail == "faults":
+            log = FaultBitmap(len(refs))
+            return log, None, log.fault
+        if detail == "counts":
+            return None, None, None
+        raise ValueError("Unknown detail level.")
+
+    @staticmethod
+    def _result(algo, refs, f, faults, hits, detail, log):
+        res = {"algorithm": algo, "frames": f}
+        if detail == "steps":
+            res["references"] = refs
+            res["steps"] = log
+        elif detail == "faults":
+            res["fault_bitmap"] = log.bits
+        res["page_faults"] = faults
+        res["page_hits"] = hits
+        return res
     #FIFO
+    # Slots fill left to right and are then reused in the same order, so
+    # the oldest page always sits under a rotating hand; residency is a
+    # set lookup instead of a scan of the frame list.
     @staticmethod
-    def fifo(refs, f):
+    def fifo(refs, f, detail="steps"):
         frames = [-1] * f
-        queue = deque()
-        steps = []
+        resident = set()
+        free = 0
+        hand = 0
+        log, hit, fault = PageReplacement._recorder(refs, f, detail)
         faults = 0
         hits = 0
 
         for t, page in enumerate(refs):
-            if page in frames:
+            if page in resident:
                 hits += 1
-                steps.append({"ref": page, "time": t, "frames": list(frames), "page_fault": False})
+                if hit:
+                    hit(t)
             else:
                 faults += 1
-                if -1 in frames:
-                    idx = frames.index(-1)
-                    frames[idx] = page
-                    queue.append(idx)
+                if free < f:
+                    idx = free
+                    free += 1
                 else:
-                    idx = queue.popleft()
-                    frames[idx] = page
-                    queue.append(idx)
-
-                steps.append({"ref": page, "time": t, "frames": list(frames), "page_fault": True})
+                    idx = hand
+                    hand = hand + 1 if hand + 1 < f else 0
+                    resident.discard(frames[idx])
+                if fault:
+                    fault(t, idx, frames[idx], page)
+                frames[idx] = page
+                resident.add(page)
 
-        return {
-            "algorithm": "FIFO",
-            "references": refs,
-            "frames": f,
-            "steps": steps,
-            "page_faults": faults,
-            "page_hits": hits,
-        }
+        return PageReplacement._result("FIFO", refs, f, faults, hits, detail, log)
     #LRU
+    # slot_of maps page -> frame slot and is kept in recency order
+    # (least recent first), so hits and evictions are both O(1).
+    # Empty slots are always filled left to right, so a cursor replaces
+    # the frames.index(-1) scan.
     @staticmethod
-    def lru(refs, f):
+    def lru(refs, f, detail="steps"):
         frames = [-1] * f
-        last = {}
-        steps = []
+        slot_of = OrderedDict()
+        free = 0
+        log, hit, fault = PageReplacement._recorder(refs, f, detail)
         faults = 0
         hits = 0
 
         for t, page in enumerate(refs):
-            if page in frames:
+            if page in slot_of:
                 hits += 1
-                last[page] = t
-                steps.append({"ref": page, "time": t, "frames": list(frames), "page_fault": False})
+                slot_of.move_to_end(page)
+                if hit:
+                    hit(t)
             else:
                 faults += 1
-                if -1 in frames:
-                    idx = frames.index(-1)
-                    frames[idx] = page
-                    last[page] = t
+                if free < f:
+                    idx = free
+                    free += 1
                 else:
-                    lru_page = None
-                    lru_time = None
-                    lru_idx = None
-                    for idx, p in enumerate(frames):
-                        lu = last.get(p, -1)
-                        if lru_time is None or lu < lru_time:
-                            lru_time = lu
-                            lru_page = p
-                            lru_idx = idx
-                    frames[lru_idx] = page
-                    last.pop(lru_page, None)
-                    last[page] = t
-
-                steps.append({"ref": page, "time": t, "frames": list(frames), "page_fault": True})
+                    _, idx = slot_of.popitem(last=False)
+                if fault:
+                    fault(t, idx, frames[idx], page)
+                frames[idx] = page
+                slot_of[page] = idx
 
-        return {
-            "algorithm": "LRU",
-            "references": refs,
-            "frames": f,
-            "steps": steps,
-            "page_faults": faults,
-            "page_hits": hits,
-        }
+        return PageReplacement._result("LRU", refs, f, faults, hits, detail, log)
     #Optimal
+    # One backward pass gives next_use[t], the next time refs[t] is needed
+    # (n if never). Resident slots sit in a max-heap on their page's next
+    # use; entries go stale when a slot is hit or refilled and are skipped
+    # on pop. Ties among never-used-again pages go to the lowest slot, as
+    # in the original left-to-right scan.
     @staticmethod
-    def optimal(refs, f):
+    def optimal(refs, f, detail="steps"):
         frames = [-1] * f
-        steps = []
+        log, hit, fault = PageReplacement._recorder(refs, f, detail)
         faults = 0
         hits = 0
         n = len(refs)
 
+        next_use = [n] * n
+        seen = {}
+        for t in range(n - 1, -1, -1):
+            page = refs[t]
+            next_use[t] = seen.get(page, n)
+            seen[page] = t
+
+        slot_of = {}
+        slot_next = [n] * f
+        heap = []
+        free = 0
+
         for t, page in enumerate(refs):
-            if page in frames:
+            if page in slot_of:
                 hits += 1
-                steps.append({"ref": page, "time": t, "frames": list(frames), "page_fault": False})
+                idx = slot_of[page]
+                if hit:
+                    hit(t)
+            else:
+                faults += 1
+                if free < f:
+                    idx = free
+                    free += 1
+                else:
+                    while True:
+                        neg, idx = heapq.heappop(heap)
+                        if slot_next[idx] == -neg:
+                            break
+                    del slot_of[frames[idx]]
+                if fault:
+                    fault(t, idx, frames[idx], page)
+                frames[idx] = page
+                slot_of[page] = idx
+
+            slot_next[idx] = next_use[t]
+            heapq.heappush(heap, (-next_use[t], idx))
+            # Drop stale entries once they outnumber the live ones
+            if len(heap) > 2 * f + 64:
+                heap = [(-slot_next[i], i) for i in range(free)]
+                heapq.heapify(heap)
+
+        return PageReplacement._result("OPTIMAL", refs, f, faults, hits, detail, log)
+
+    #CLOCK
+    # Resident slots form a circle with one reference bit each. A hit sets
+    # the bit; on a fault the hand clears set bits until it finds a clear
+    # one and replaces that slot. Each bit is cleared at most once per time
+    # it was set, so a reference is O(1) amortized.
+    @staticmethod
+    def clock(refs, f, detail="steps"):
+        frames = [-1] * f
+        used = bytearray(f)
+        slot_of = {}
+        free = 0
+        hand = 0
+        log, hit, fault = PageReplacement._recorder(refs, f, detail)
+        faults = 0
+        hits = 0
+
+        for t, page in enumerate(refs):
+            idx = slot_of.get(page)
+            if idx is not None:
+                hits += 1
+                used[idx] = 1
+                if hit:
+                    hit(t)
+            else:
+                faults += 1
+                if free < f:
+                    idx = free
+                    free += 1
+                else:
+                    while used[hand]:
+                        used[hand] = 0
+                        hand = hand + 1 if hand + 1 < f else 0
+                    idx = hand
+                    hand = hand + 1 if hand + 1 < f else 0
+                    del slot_of[frames[idx]]
+                if fault:
+                    fault(t, idx, frames[idx], page)
+                frames[idx] = page
+                used[idx] = 1
+                slot_of[page] = idx
+
+        return PageReplacement._result("CLOCK", refs, f, faults, hits, detail, log)
+    #Second-Chance
+    # The FIFO-queue form of CLOCK: the oldest page is evicted unless its
+    # reference bit is set, in which case the bit is cleared and the page
+    # goes to the back of the queue. Same victims as clock(), O(1) amortized.
+    @staticmethod
+    def second_chance(refs, f, detail="steps"):
+        frames = [-1] * f
+        used = bytearray(f)
+        queue = deque()
+        slot_of = {}
+        free = 0
+        log, hit, fault = PageReplacement._recorder(refs, f, detail)
+        faults = 0
+        hits = 0
+
+        for t, page in enumerate(refs):
+            idx = slot_of.get(page)
+            if idx is not None:
+                hits += 1
+                used[idx] = 1
+                if hit:
+                    hit(t)
+            else:
+                faults += 1
+                if free < f:
+                    idx = free
+                    free += 1
+                else:
+                    idx = queue.popleft()
+                    while used[idx]:
+                        used[idx] = 0
+                        queue.append(idx)
+                        idx = queue.popleft()
+                    del slot_of[frames[idx]]
+                if fault:
+                    fault(t, idx, frames[idx], page)
+                frames[idx] = page
+                used[idx] = 1
+                slot_of[page] = idx
+                queue.append(idx)
+
+        return PageReplacement._result("SECOND_CHANCE", refs, f, faults, hits, detail, log)
+    #LFU
+    # Pages are bucketed by use count; each bucket is kept in recency order
+    # so ties go to the least recently used page. min_count tracks the
+    # lowest non-empty bucket, so hits and evictions are O(1). Counts are
+    # dropped when a page is evicted.
+    @staticmethod
+    def lfu(refs, f, detail="steps"):
+        frames = [-1] * f
+        slot_of = {}
+        count = {}
+        buckets = {}
+        min_count = 0
+        free = 0
+        log, hit, fault = PageReplacement._recorder(refs, f, detail)
+        faults = 0
+        hits = 0
+
+        for t, page in enumerate(refs):
+            idx = slot_of.get(page)
+            if idx is not None:
+                hits += 1
+                c = count[page]
+                bucket = buckets[c]
+                del bucket[page]
+                if not bucket:
+                    del buckets[c]
+                    if min_count == c:
+                        min_count = c + 1
+                count[page] = c + 1
+                bucket = buckets.get(c + 1)
+                if bucket is None:
+                    bucket = buckets[c + 1] = OrderedDict()
+                bucket[page] = None
+                if hit:
+                    hit(t)
+            else:
+                faults += 1
+                if free < f:
+                    idx = free
+                    free += 1
+                else:
+                    bucket = buckets[min_count]
+                    victim, _ = bucket.popitem(last=False)
+                    if not bucket:
+                        del buckets[min_count]
+                    del count[victim]
+                    idx = slot_of.pop(victim)
+                if fault:
+                    fault(t, idx, frames[idx], page)
+                frames[idx] = page
+                slot_of[page] = idx
+                count[page] = 1
+                bucket = buckets.get(1)
+                if bucket is None:
+                    bucket = buckets[1] = OrderedDict()
+                bucket[page] = None
+                min_count = 1
+
+        return PageReplacement._result("LFU", refs, f, faults, hits, detail, log)
+    #ARC
+    # Adaptive Replacement Cache (Megiddo & Modha). T1 holds pages seen once
+    # recently, T2 pages seen at least twice; B1/B2 remember the pages
+    # recently evicted from each (ghosts, no frame). A ghost hit moves the
+    # target size p of T1 toward the list that would have kept the page.
+    # All four lists are OrderedDicts (LRU first), so a reference is O(1).
+    @staticmethod
+    def arc(refs, f, detail="steps"):
+        frames = [-1] * f
+        t1 = OrderedDict()
+        t2 = OrderedDict()
+        b1 = OrderedDict()
+        b2 = OrderedDict()
+        p = 0
+        free = 0
+        log, hit, fault = PageReplacement._recorder(refs, f, detail)
+        faults = 0
+        hits = 0
+
+        for t, page in enumerate(refs):
+            if page in t1:
+                hits += 1
+                t2[page] = t1.pop(page)
+                if hit:
+                    hit(t)
+                continue
+            if page in t2:
+                hits += 1
+                t2.move_to_end(page)
+                if hit:
+                    hit(t)
                 continue
 
             faults += 1
-            if -1 in frames:
-                idx = frames.index(-1)
-                frames[idx] = page
+            in_b2 = page in b2
+            idx = None
+            if page in b1:
+                p = min(f, p + max(len(b2) / len(b1), 1))
+                del b1[page]
+                target = t2
+            elif in_b2:
+                p = max(0, p - max(len(b1) / len(b2), 1))
+                del b2[page]
+                target = t2
             else:
-                farthest = -1
-                replace_idx = None
-                for idx, p in enumerate(frames):
-                    nxt = None
-                    for k in range(t + 1, n):
-                        if refs[k] == p:
-                            nxt = k
+                target = t1
+                if len(t1) + len(b1) == f:
+                    if len(t1) < f:
+                        b1.popitem(last=False)
+                    else:
+                        # B1 is empty: drop the LRU page of T1 outright
+                        _, idx = t1.popitem(last=False)
+                elif len(t1) + len(t2) + len(b1) + len(b2) >= 2 * f:
+                    b2.popitem(last=False)
+
+            if idx is None:
+                if free < f:
+                    idx = free
+                    free += 1
+                elif t1 and (len(t1) > p or (in_b2 and len(t1) == p)):
+                    # T1 is over its target size: its LRU page becomes a ghost
+                    victim, idx = t1.popitem(last=False)
+                    b1[victim] = None
+                else:
+                    victim, idx = t2.popitem(last=False)
+                    b2[victim] = None
+
+            if fault:
+                fault(t, idx, frames[idx], page)
+            frames[idx] = page
+            target[page] = idx
+
+        return PageReplacement._result("ARC", refs, f, faults, hits, detail, log)
+    #2Q
+    # Johnson & Shasha's full 2Q. New pages enter A1in (FIFO, about a
+    # quarter of the frames); pages evicted from it are remembered in
+    # A1out (ghosts, about half the frame count). Only a page referenced
+    # again while in A1out is promoted to Am, which is plain LRU. Hits in
+    # A1in leave it untouched. Every list is O(1) per reference.
+    @staticmethod
+    def two_q(refs, f, detail="steps"):
+        frames = [-1] * f
+        kin = max(1, f // 4)
+        kout = max(1, f // 2)
+        a1in = OrderedDict()
+        a1out = OrderedDict()
+        am = OrderedDict()
+        free = 0
+        log, hit, fault = PageReplacement._recorder(refs, f, detail)
+        faults = 0
+        hits = 0
+
+        for t, page in enumerate(refs):
+            if page in am:
+                hits += 1
+                am.move_to_end(page)
+                if hit:
+                    hit(t)
+                continue
+            if page in a1in:
+                hits += 1
+                if hit:
+                    hit(t)
+                continue
+
+            faults += 1
+            promote = page in a1out
+            if free < f:
+                idx = free
+                free += 1
+            elif len(a1in) > kin or not am:
+                victim, idx = a1in.popitem(last=False)
+                a1out[victim] = None
+                if len(a1out) > kout:
+                    a1out.popitem(last=False)
+            else:
+                _, idx = am.popitem(last=False)
+
+            if promote:
+                a1out.pop(page, None)
+                am[page] = idx
+            else:
+                a1in[page] = idx
+            if fault:
+                fault(t, idx, frames[idx], page)
+            frames[idx] = page
+
+        return PageReplacement._result("2Q", refs, f, faults, hits, detail, log)
+
+    #Working Set
+    # Resident set = pages referenced in the last `delta` references
+    # (Denning's W(t, delta)). last[p] is the time of p's latest reference,
+    # so a reference is a hit iff last[p] >= t - delta, and the page that
+    # slides out of the window (refs[t - delta]) leaves the set iff it was
+    # not referenced since. Each reference is O(1) whatever delta is.
+    # "ws_size" holds |W(t, delta)| after every reference.
+    @staticmethod
+    def working_set(refs, delta):
+        PageReplacement._check_refs(refs)
+        if delta <= 0:
+            raise ValueError("window must be > 0")
+        last = {}
+        sizes = array("I", bytes(4 * len(refs)))
+        size = 0
+        faults = 0
+
+        for t, page in enumerate(refs):
+            start = t - delta
+            prev = last.get(page)
+            if prev is None or prev < start:
+                faults += 1
+            if start >= 0 and last[refs[start]] == start:
+                size -= 1
+            if prev is None or prev <= start:
+                size += 1
+            last[page] = t
+            sizes[t] = size
+
+        return PageReplacement._sized("WS", refs, faults, sizes, window=delta)
+    #PFF
+    # Page-fault frequency (Chu & Opderbeck). On a fault, if more than
+    # `threshold` references passed since the previous fault, every page not
+    # referenced since that fault is released; the faulting page is always
+    # added. The resident set is kept in recency order, so the released
+    # pages are a prefix of it and each one costs O(1) to drop.
+    # "ws_size" holds the resident set size after every reference.
+    @staticmethod
+    def pff(refs, threshold):
+        PageReplacement._check_refs(refs)
+        if threshold <= 0:
+            raise ValueError("threshold must be > 0")
+        resident = OrderedDict()
+        sizes = array("I", bytes(4 * len(refs)))
+        last_fault = None
+        faults = 0
+
+        for t, page in enumerate(refs):
+            if page in resident:
+                resident.move_to_end(page)
+                resident[page] = t
+            else:
+                faults += 1
+                if last_fault is not None and t - last_fault > threshold:
+                    while resident:
+                        oldest = next(iter(resident.values()))
+                        if oldest >= last_fault:
                             break
-                    if nxt is None:
-                        replace_idx = idx
-                        break
-                    if nxt > farthest:
-                        farthest = nxt
-                        replace_idx = idx
-                frames[replace_idx] = page
+                        resident.popitem(last=False)
+                resident[page] = t
+                last_fault = t
+            sizes[t] = len(resident)
+
+        return PageReplacement._sized("PFF", refs, faults, sizes, threshold=threshold)
+
+    @staticmethod
+    def _sized(algo, refs, faults, sizes, **params):
+        res = {"algorithm": algo}
+        res.update(params)
+        res["page_faults"] = faults
+        res["page_hits"] = len(refs) - faults
+        res["ws_size"] = sizes
+        res["max_ws"] = max(sizes) if sizes else 0
+        res["avg_ws"] = sum(sizes) / len(sizes) if sizes else 0.0
+        return res
+
+    # Fault curve
+    # Faults for every frame count 1..max_frames from one pass over refs,
+    # using the stack property of LRU and Optimal (Mattson et al.): a
+    # reference hits with F frames iff its stack distance is <= F.
+    @staticmethod
+    def fault_curve(refs, max_frames, algo="LRU"):
+        PageReplacement._validate(refs, max_frames)
+        algo = algo.upper()
+        if algo == "LRU":
+            hist = PageReplacement._lru_distances(refs, max_frames)
+        elif algo == "OPTIMAL":
+            hist = PageReplacement._opt_distances(refs, max_frames)
+        else:
+            raise ValueError("fault_curve supports LRU and OPTIMAL only.")
+
+        n = len(refs)
+        faults = []
+        hits = 0
+        for d in range(1, max_frames + 1):
+            hits += hist[d]
+            faults.append(n - hits)
+        return {
+            "algorithm": algo,
+            "frames": list(range(1, max_frames + 1)),
+            "page_faults": faults,
+        }
+
+    # LRU stack distances with a Fenwick tree over reference times: each
+    # page keeps a mark at its last reference, so the pages touched since
+    # page p was last used are the marks after last[p]. O(n log n).
+    @staticmethod
+    def _lru_distances(refs, max_frames):
+        n = len(refs)
+        tree = [0] * (n + 1)
+        last = {}
+        hist = [0] * (max_frames + 1)
+
+        for t, page in enumerate(refs):
+            p = last.get(page)
+            if p is not None:
+                # marks in [0, p], then distance = marks after p + 1
+                i = p + 1
+                before = 0
+                while i:
+                    before += tree[i]
+                    i &= i - 1
+                d = len(last) - before + 1
+                if d <= max_frames:
+                    hist[d] += 1
+                i = p + 1
+                while i <= n:
+                    tree[i] -= 1
+                    i += i & -i
+            i = t + 1
+            while i <= n:
+                tree[i] += 1
+                i += i & -i
+            last[page] = t
+        return hist
+
+    # Optimal stack distances. The stack is ordered so its top F pages are
+    # what Optimal keeps with F frames; on each reference the referenced
+    # page moves to the top and, level by level, the page needed later is
+    # pushed down. Only the top max_frames levels are kept, so a reference
+    # costs O(depth) and the pass is O(n * max_frames) in the worst case.
+    @staticmethod
+    def _opt_distances(refs, max_frames):
+        n = len(refs)
+        next_use = [n] * n
+        seen = {}
+        for t in range(n - 1, -1, -1):
+            page = refs[t]
+            next_use[t] = seen.get(page, n)
+            seen[page] = t
+
+        stack = []
+        stack_next = []
+        hist = [0] * (max_frames + 1)
+
+        for t, page in enumerate(refs):
+            try:
+                depth = stack.index(page)
+                hist[depth + 1] += 1
+            except ValueError:
+                depth = len(stack)
+                if depth < max_frames:
+                    stack.append(None)
+                    stack_next.append(n)
+
+            if depth:
+                carry = stack[0]
+                carry_next = stack_next[0]
+                for j in range(1, depth):
+                    if stack_next[j] > carry_next:
+                        stack[j], carry = carry, stack[j]
+                        stack_next[j], carry_next = carry_next, stack_next[j]
+                if depth < len(stack):
+                    stack[depth] = carry
+                    stack_next[depth] = carry_next
+            if stack:
+                stack[0] = page
+                stack_next[0] = next_use[t]
+        return hist
+
+    # FIFO sweep
+    # FIFO is not a stack algorithm, so each frame count is its own run.
+    # Integer refs are copied once into a shared int64 block; workers attach
+    # to it by name (pool initializer) and read it through a memoryview, so
+    # a task is just a frame count. Refs that do not fit in int64 (strings,
+    # floats, wider ints) are swept in-process, as with workers=1. "belady" lists every F whose fault count
+    # is higher than with F - 1 frames.
+    @staticmethod
+    def fifo_sweep(refs, max_frames, workers=None):
+        PageReplacement._validate(refs, max_frames)
+        counts = range(1, max_frames + 1)
+        packed = None
+        if workers != 1 and max_frames > 1:
+            try:
+                packed = array("q", refs)
+            except (TypeError, OverflowError):
+                # Non-integer or wider than 64-bit pages do not fit the
+                # shared int64 block; they are swept in-process instead
+                packed = None
 
-            steps.append({"ref": page, "time": t, "frames": list(frames), "page_fault": True})
+        if packed is None:
+            faults = [PageReplacement.fifo(refs, f, "counts")["page_faults"]
+                      for f in counts]
+        else:
+            shm = shared_memory.SharedMemory(create=True, size=max(len(packed), 1) * 8)
+            try:
+                view = shm.buf.cast("q")
+                try:
+                    view[:len(packed)] = packed
+                finally:
+                    view.release()
+                with ProcessPoolExecutor(
+                    max_workers=workers,
+                    initializer=_sweep_attach,
+                    initargs=(shm.name, len(packed)),
+                ) as pool:
+                    faults = list(pool.map(_sweep_fifo, counts))
+            finally:
+                shm.close()
+                shm.unlink()
 
+        belady = [f for f in range(2, max_frames + 1) if faults[f - 1] > faults[f - 2]]
         return {
-            "algorithm": "OPTIMAL",
-            "references": refs,
-            "frames": f,
-            "steps": steps,
+            "algorithm": "FIFO",
+            "frames": list(counts),
             "page_faults": faults,
-            "page_hits": hits,
+            "belady": belady,
         }
+
+    # Batch simulate
+    # jobs: iterable of (refs, frames, algo). Integer refs are packed into
+    # the narrowest signed array that holds them (pickled as one bytes
+    # blob, not a list of ints); other pages are sent as given. Jobs are
+    # shipped to the pool in chunks, so per-job overhead stays small.
+    # Results come back in input order, with "references" (and the step
+    # log) pointing at the caller's refs; detail defaults to "counts" so
+    # the replies are small too. workers=1 runs in-process.
+    @staticmethod
+    def simulate_batch(jobs, detail="counts", workers=None, chunksize=None):
+        if detail not in PageReplacement.DETAILS:
+            raise ValueError("Unknown detail level.")
+        packed = []
+        originals = []
+        for refs, frames, algo in jobs:
+            PageReplacement._validate(refs, frames)
+            packed.append((PageReplacement._pack(refs), frames, algo))
+            originals.append(refs)
+        if not packed:
+            return []
+
+        if workers == 1 or len(packed) == 1:
+            results = _batch_run(packed, detail)
+        else:
+            if chunksize is None:
+                chunksize = -(-len(packed) // ((workers or os.cpu_count() or 1) * 4))
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                chunks = [packed[i:i + chunksize] for i in range(0, len(packed), chunksize)]
+                results = []
+                for part in pool.map(_batch_run, chunks, [detail] * len(chunks)):
+                    results.extend(part)
+
+        if detail == "steps":
+            for res, refs in zip(results, originals):
+                res["references"] = refs
+                res["steps"].refs = refs
+        return results
+
+    @staticmethod
+    def _pack(refs):
+        if isinstance(refs, array):
+            return refs
+        if all(type(page) is int for page in refs):
+            lo = min(refs, default=0)
+            hi = max(refs, default=0)
+            for code in ("b", "h", "i", "q"):
+                bits = array(code).itemsize * 8 - 1
+                if -(1 << bits) <= lo and hi < (1 << bits):
+                    return array(code, refs)
+        # Non-integer or wider than 64-bit pages go as given; a TraceFile
+        # holds an mmap, which cannot be pickled
+        if isinstance(refs, TraceFile):
+            return list(refs)
+        return refs
+
+
+# Per-worker state for PageReplacement.fifo_sweep
+_sweep_shm = None
+_sweep_refs = None
+
+
+def _sweep_attach(name, n):
+    global _sweep_shm, _sweep_refs
+    _sweep_shm = shared_memory.SharedMemory(name=name)
+    _sweep_refs = _sweep_shm.buf.cast("q")[:n]
+
+
+def _sweep_fifo(f):
+    return PageReplacement.fifo(_sweep_refs, f, "counts")["page_faults"]
+
+
+# Worker for PageReplacement.simulate_batch: one chunk of packed jobs
+def _batch_run(chunk, detail):
+    return [PageReplacement.simulate(refs, frames, algo, detail)
+            for refs, frames, algo in chunk]
+
+
+# Online simulators
+# One object per run that takes references one at a time, for live
+# streams where the trace is never held in memory. access(page) returns
+# (hit, evicted), where evicted is the page that lost its frame (None if
+# nothing did). State is bounded by the frame count (plus ghost lists of
+# at most 2 * frames for ARC/2Q) and a `window`-byte ring that keeps the
+# fault rate over the last `window` references.
+class OnlinePager:
+    ALGO = None
+
+    def __init__(self, frames, window=1000):
+        if frames <= 0:
+            raise ValueError("num_frames must be > 0")
+        if window <= 0:
+            raise ValueError("window must be > 0")
+        self.frames = frames
+        self.window = window
+        self.accesses = 0
+        self.page_faults = 0
+        self.page_hits = 0
+        self._ring = bytearray(window)
+        self._window_faults = 0
+
+    def access(self, page):
+        hit, evicted = self._access(page)
+        i = self.accesses % self.window
+        miss = 0 if hit else 1
+        self._window_faults += miss - self._ring[i]
+        self._ring[i] = miss
+        self.accesses += 1
+        if hit:
+            self.page_hits += 1
+        else:
+            self.page_faults += 1
+        return hit, evicted
+
+    def feed(self, pages):
+        access = self.access
+        for page in pages:
+            access(page)
+        return self.stats()
+
+    @property
+    def fault_rate(self):
+        return self.page_faults / self.accesses if self.accesses else 0.0
+
+    @property
+    def window_fault_rate(self):
+        seen = min(self.accesses, self.window)
+        return self._window_faults / seen if seen else 0.0
+
+    def stats(self):
+        return {
+            "algorithm": self.ALGO,
+            "frames": self.frames,
+            "accesses": self.accesses,
+            "page_faults": self.page_faults,
+            "page_hits": self.page_hits,
+            "fault_rate": self.fault_rate,
+            "window_fault_rate": self.window_fault_rate,
+        }
+
+
+class FIFOPager(OnlinePager):
+    ALGO = "FIFO"
+
+    def __init__(self, frames, window=1000):
+        super().__init__(frames, window)
+        self._queue = deque()
+        self._resident = set()
+
+    def _access(self, page):
+        if page in self._resident:
+            return True, None
+        evicted = None
+        if len(self._queue) == self.frames:
+            evicted = self._queue.popleft()
+            self._resident.discard(evicted)
+        self._queue.append(page)
+        self._resident.add(page)
+        return False, evicted
+
+
+class LRUPager(OnlinePager):
+    ALGO = "LRU"
+
+    def __init__(self, frames, window=1000):
+        super().__init__(frames, window)
+        self._pages = OrderedDict()
+
+    def _access(self, page):
+        pages = self._pages
+        if page in pages:
+            pages.move_to_end(page)
+            return True, None
+        evicted = None
+        if len(pages) == self.frames:
+            evicted, _ = pages.popitem(last=False)
+        pages[page] = None
+        return False, evicted
+
+
+class ClockPager(OnlinePager):
+    ALGO = "CLOCK"
+
+    def __init__(self, frames, window=1000):
+        super().__init__(frames, window)
+        self._slots = []
+        self._used = bytearray(frames)
+        self._slot_of = {}
+        self._hand = 0
+
+    def _access(self, page):
+        idx = self._slot_of.get(page)
+        if idx is not None:
+            self._used[idx] = 1
+            return True, None
+        slots = self._slots
+        used = self._used
+        evicted = None
+        if len(slots) < self.frames:
+            idx = len(slots)
+            slots.append(page)
+        else:
+            hand = self._hand
+            while used[hand]:
+                used[hand] = 0
+                hand = hand + 1 if hand + 1 < self.frames else 0
+            idx = hand
+            self._hand = hand + 1 if hand + 1 < self.frames else 0
+            evicted = slots[idx]
+            del self._slot_of[evicted]
+            slots[idx] = page
+        used[idx] = 1
+        self._slot_of[page] = idx
+        return False, evicted
+
+
+class LFUPager(OnlinePager):
+    ALGO = "LFU"
+
+    def __init__(self, frames, window=1000):
+        super().__init__(frames, window)
+        self._count = {}
+        self._buckets = {}
+        self._min_count = 0
+
+    def _bucket(self, c):
+        bucket = self._buckets.get(c)
+        if bucket is None:
+            bucket = self._buckets[c] = OrderedDict()
+        return bucket
+
+    def _access(self, page):
+        count = self._count
+        buckets = self._buckets
+        c = count.get(page)
+        if c is not None:
+            bucket = buckets[c]
+            del bucket[page]
+            if not bucket:
+                del buckets[c]
+                if self._min_count == c:
+                    self._min_count = c + 1
+            count[page] = c + 1
+            self._bucket(c + 1)[page] = None
+            return True, None
+        evicted = None
+        if len(count) == self.frames:
+            bucket = buckets[self._min_count]
+            evicted, _ = bucket.popitem(last=False)
+            if not bucket:
+                del buckets[self._min_count]
+            del count[evicted]
+        count[page] = 1
+        self._bucket(1)[page] = None
+        self._min_count = 1
+        return False, evicted
+
+
+class ARCPager(OnlinePager):
+    ALGO = "ARC"
+
+    def __init__(self, frames, window=1000):
+        super().__init__(frames, window)
+        self._t1 = OrderedDict()
+        self._t2 = OrderedDict()
+        self._b1 = OrderedDict()
+        self._b2 = OrderedDict()
+        self._p = 0
+
+    def _access(self, page):
+        t1, t2, b1, b2 = self._t1, self._t2, self._b1, self._b2
+        f = self.frames
+        if page in t1:
+            del t1[page]
+            t2[page] = None
+            return True, None
+        if page in t2:
+            t2.move_to_end(page)
+            return True, None
+
+        in_b2 = page in b2
+        evicted = None
+        replace = True
+        if page in b1:
+            self._p = min(f, self._p + max(len(b2) / len(b1), 1))
+            del b1[page]
+            target = t2
+        elif in_b2:
+            self._p = max(0, self._p - max(len(b1) / len(b2), 1))
+            del b2[page]
+            target = t2
+        else:
+            target = t1
+            if len(t1) + len(b1) == f:
+                if len(t1) < f:
+                    b1.popitem(last=False)
+                else:
+                    evicted, _ = t1.popitem(last=False)
+                    replace = False
+            elif len(t1) + len(t2) + len(b1) + len(b2) >= 2 * f:
+                b2.popitem(last=False)
+
+        if replace and len(t1) + len(t2) == f:
+            if t1 and (len(t1) > self._p or (in_b2 and len(t1) == self._p)):
+                evicted, _ = t1.popitem(last=False)
+                b1[evicted] = None
+            else:
+                evicted, _ = t2.popitem(last=False)
+                b2[evicted] = None
+        target[page] = None
+        return False, evicted
+
+
+class TwoQPager(OnlinePager):
+    ALGO = "2Q"
+
+    def __init__(self, frames, window=1000):
+        super().__init__(frames, window)
+        self._kin = max(1, frames // 4)
+        self._kout = max(1, frames // 2)
+        self._a1in = OrderedDict()
+        self._a1out = OrderedDict()
+        self._am = OrderedDict()
+
+    def _access(self, page):
+        a1in, a1out, am = self._a1in, self._a1out, self._am
+        if page in am:
+            am.move_to_end(page)
+            return True, None
+        if page in a1in:
+            return True, None
+
+        promote = page in a1out
+        evicted = None
+        if len(a1in) + len(am) == self.frames:
+            if len(a1in) > self._kin or not am:
+                evicted, _ = a1in.popitem(last=False)
+                a1out[evicted] = None
+                if len(a1out) > self._kout:
+                    a1out.popitem(last=False)
+            else:
+                evicted, _ = am.popitem(last=False)
+        if promote:
+            a1out.pop(page, None)
+            am[page] = None
+        else:
+            a1in[page] = None
+        return False, evicted
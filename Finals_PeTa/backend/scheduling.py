@@ -1,9 +1,28 @@
 # CPU Scheduling Algorithms
-from copy import deepcopy
 from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+import heapq
+
+import numpy as np
+
+# Load weight per nice level (-20..19), as in the Linux CFS scheduler
+_NICE_WEIGHTS = (
+    88761, 71755, 56483, 46273, 36291,
+    29154, 23254, 18705, 14949, 11916,
+    9548, 7620, 6100, 4904, 3906,
+    3121, 2501, 1991, 1586, 1277,
+    1024, 820, 655, 526, 423,
+    335, 272, 215, 172, 137,
+    110, 87, 70, 56, 45,
+    36, 29, 23, 18, 15,
+)
+
 
 class Process:
     # Holds all process-related data
+    # __slots__ keeps each record small; large traces hold millions of these
+    __slots__ = ("pid", "at", "bt", "priority", "wt", "tat")
+
     def __init__(self, pid, at, bt, priority=0):
         self.pid = pid
         self.at = int(at)
@@ -23,14 +42,171 @@ class Process:
         }
 
 
+class ProcessTable:
+    # Columnar process storage: one typed array per field instead of one
+    # object per process. Every scheduler accepts either a list of Process
+    # or a ProcessTable.
+    __slots__ = ("pid", "at", "bt", "priority")
+
+    def __init__(self, pid, at, bt, priority=None):
+        # pids are labels, not numbers: keep them as an object column so
+        # NumPy does not cast mixed pids (1 and "P2", 1.0 and 2) to a
+        # common type. An ndarray passed in is used as is.
+        if isinstance(pid, np.ndarray):
+            self.pid = pid
+        else:
+            pid = list(pid)
+            self.pid = np.fromiter(pid, dtype=object, count=len(pid))
+        self.at = np.asarray(at, dtype=np.int64)
+        self.bt = np.asarray(bt, dtype=np.int64)
+        if priority is None:
+            self.priority = np.zeros(len(self.at), dtype=np.int64)
+        else:
+            self.priority = np.asarray(priority, dtype=np.int64)
+
+        n = len(self.pid)
+        if not (len(self.at) == len(self.bt) == len(self.priority) == n):
+            raise ValueError("pid, at, bt and priority must have the same length.")
+
+    @staticmethod
+    def from_processes(processes):
+        if isinstance(processes, ProcessTable):
+            return processes
+        return ProcessTable(
+            [p.pid for p in processes],
+            [p.at for p in processes],
+            [p.bt for p in processes],
+            [p.priority for p in processes],
+        )
+
+    def __len__(self):
+        return len(self.at)
+
+    def take(self, order):
+        return ProcessTable(
+            self.pid[order], self.at[order], self.bt[order], self.priority[order]
+        )
+
+
+class _IndexedHeap:
+    # Binary min-heap over item ids 0..size-1 with a position map, so a
+    # queued item's key can be lowered in place (decrease-key) in O(log n).
+    __slots__ = ("heap", "key", "pos")
+
+    def __init__(self, size):
+        self.heap = []
+        self.key = [0] * size
+        self.pos = [-1] * size
+
+    def push(self, i, key):
+        self.heap.append(i)
+        self.decrease_key(i, key, len(self.heap) - 1)
+
+    def decrease_key(self, i, key, j=None):
+        # Sift i up from j (default: where it sits now) to its place for key
+        heap, keys, pos = self.heap, self.key, self.pos
+        keys[i] = key
+        if j is None:
+            j = pos[i]
+        while j:
+            parent = (j - 1) >> 1
+            p = heap[parent]
+            if keys[p] <= key:
+                break
+            heap[j] = p
+            pos[p] = j
+            j = parent
+        heap[j] = i
+        pos[i] = j
+
+    def pop(self):
+        # Bottom-up, as in heapq: move the smaller child up until a leaf is
+        # reached, then sift the last item back up from there. That item
+        # came from the bottom, so this saves a compare per level.
+        heap, key, pos = self.heap, self.key, self.pos
+        top = heap[0]
+        pos[top] = -1
+        item = heap.pop()
+        n = len(heap)
+        if n:
+            j = 0
+            child = 1
+            while child < n:
+                right = child + 1
+                if right < n and key[heap[right]] < key[heap[child]]:
+                    child = right
+                c = heap[child]
+                heap[j] = c
+                pos[c] = j
+                j = child
+                child = 2 * j + 1
+            self.decrease_key(item, key[item], j)
+        return key[top], top
+
+
+class ScheduleStream:
+    # Iterator over scheduler events, in the order they happen:
+    #   ("segment", pid, start, finish)      a Gantt segment was closed
+    #   ("complete", row, pid, wait, tat)    a process finished
+    #   ("rounds", pids, start, quantum, k)  k full Round Robin rotations over
+    #                                        pids (only with compress=True)
+    # row indexes into .table, which is in the same order as the "table"
+    # of the dict response. Running averages cover the processes completed
+    # so far and can be read at any point.
+    def __init__(self, tbl, events):
+        self.table = tbl
+        self.completed = 0
+        self.total_wt = 0
+        self.total_tat = 0
+        self._events = events
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        ev = next(self._events)
+        if ev[0] == "complete":
+            self.completed += 1
+            self.total_wt += ev[3]
+            self.total_tat += ev[4]
+        return ev
+
+    @property
+    def avg_wt(self):
+        return self.total_wt / self.completed if self.completed else 0
+
+    @property
+    def avg_tat(self):
+        return self.total_tat / self.completed if self.completed else 0
+
+
 class CPUScheduler:
+    # Schedulers never modify the caller's processes: wait and turnaround
+    # times are written into wt/tat arrays indexed like the ProcessTable.
+
     # Unified response formatting
     @staticmethod
-    def _make_response(processes, timeline):
-        table = [p.to_dict() for p in processes]
-        n = len(processes)
-        avg_wt = sum(p.wt for p in processes) / n if n else 0
-        avg_tat = sum(p.tat for p in processes) / n if n else 0
+    def _make_response(tbl, wt, tat, timeline):
+        wt = np.asarray(wt, dtype=np.int64)
+        tat = np.asarray(tat, dtype=np.int64)
+        table = [
+            {
+                "pid": pid,
+                "arrival": at,
+                "burst": bt,
+                "priority": pr,
+                "wait": w,
+                "tat": t,
+            }
+            for pid, at, bt, pr, w, t in zip(
+                tbl.pid.tolist(), tbl.at.tolist(), tbl.bt.tolist(),
+                tbl.priority.tolist(), wt.tolist(), tat.tolist(),
+            )
+        ]
+        n = len(tbl)
+        # Integer sums keep the averages bit-identical to sum(...) / n
+        avg_wt = int(wt.sum()) / n if n else 0
+        avg_tat = int(tat.sum()) / n if n else 0
 
         gantt = [
             {"pid": pid, "start": st, "finish": ft} for (pid, st, ft) in timeline
@@ -42,229 +218,976 @@ class CPUScheduler:
             "avg_tat": avg_tat,
         }
 
+    # Drains a ScheduleStream into the dict response
+    @staticmethod
+    def _collect(stream):
+        n = len(stream.table)
+        wt = [0] * n
+        tat = [0] * n
+        timeline = []
+        rounds = []
+        for ev in stream:
+            if ev[0] == "segment":
+                timeline.append(ev[1:])
+            elif ev[0] == "complete":
+                wt[ev[1]] = ev[3]
+                tat[ev[1]] = ev[4]
+            else:
+                _, pids, start, quantum, k = ev
+                rounds.append((len(timeline), quantum, k))
+                timeline.append((pids, start, start + k * len(pids) * quantum))
+
+        res = CPUScheduler._make_response(stream.table, wt, tat, timeline)
+        gantt = res["timeline"]
+        for pos, quantum, k in rounds:
+            seg = gantt[pos]
+            gantt[pos] = {
+                "pids": list(seg["pid"]),
+                "start": seg["start"],
+                "finish": seg["finish"],
+                "quantum": quantum,
+                "rounds": k,
+            }
+        return res
+
+    # Expands compressed Round Robin records back into plain segments
+    @staticmethod
+    def expand_timeline(timeline):
+        out = []
+        for seg in timeline:
+            if "rounds" not in seg:
+                out.append(seg)
+                continue
+            t = seg["start"]
+            q = seg["quantum"]
+            for _ in range(seg["rounds"]):
+                for pid in seg["pids"]:
+                    out.append({"pid": pid, "start": t, "finish": t + q})
+                    t += q
+        return out
+
+    # Streaming mode
+    # algo is the name of one of the scheduler methods below, e.g.
+    # CPUScheduler.stream(procs, "round_robin", quantum=2). Extra keyword
+    # arguments go to the "cfs", "mlfq" and "priority_preemptive" engines.
+    @staticmethod
+    def stream(processes, algo, quantum=None, compress=False, **params):
+        algo = algo.lower()
+        tbl = ProcessTable.from_processes(processes)
+        if algo in ("fcfs", "round_robin"):
+            tbl = tbl.take(np.argsort(tbl.at, kind="stable"))
+
+        if algo == "fcfs":
+            events = CPUScheduler._fcfs_events(tbl)
+        elif algo == "sjf":
+            events = CPUScheduler._non_preemptive_events(tbl, tbl.bt)
+        elif algo == "sjf_preemptive":
+            events = CPUScheduler._preemptive_events(tbl, True)
+        elif algo == "priority":
+            events = CPUScheduler._non_preemptive_events(tbl, tbl.priority)
+        elif algo == "priority_preemptive":
+            events = CPUScheduler._aging_events(tbl, **params)
+        elif algo == "round_robin":
+            if quantum is None or quantum <= 0:
+                raise ValueError("Quantum must be > 0.")
+            events = CPUScheduler._round_robin_events(tbl, quantum, compress)
+        elif algo == "cfs":
+            events = CPUScheduler._cfs_events(tbl, **params)
+        elif algo == "mlfq":
+            events = CPUScheduler._mlfq_events(tbl, **params)
+        else:
+            raise ValueError("Unknown algorithm.")
+        return ScheduleStream(tbl, events)
+
     # FCFS
+    # finish[i] = max(finish[i-1], at[i]) + bt[i] unrolls to
+    # cumsum(bt)[i] + max(0, running max of at[j] - cumsum(bt)[j-1]),
+    # so the whole schedule is a handful of array passes.
+    @staticmethod
+    def _fcfs_arrays(tbl):
+        at = tbl.at
+        bt = tbl.bt
+        done = np.cumsum(bt)
+        finish = done + np.maximum(np.maximum.accumulate(at - (done - bt)), 0)
+        start = finish - bt
+        wt = start - at
+        tat = wt + bt
+        return start, finish, wt, tat
+
+    @staticmethod
+    def _fcfs_events(tbl):
+        start, finish, wt, tat = CPUScheduler._fcfs_arrays(tbl)
+        rows = zip(
+            tbl.pid.tolist(), start.tolist(), finish.tolist(), wt.tolist(), tat.tolist()
+        )
+        for i, (pid, st, ft, w, t) in enumerate(rows):
+            yield ("segment", pid, st, ft)
+            yield ("complete", i, pid, w, t)
+
+    # The dict path skips the per-event stream: FCFS is fully vectorized
     @staticmethod
     def fcfs(processes):
-        procs = deepcopy(processes)
-        procs.sort(key=lambda p: p.at)
-        time = 0
-        timeline = []
-        for p in procs:
-            if time < p.at:
-                time = p.at
-            start = time
-            p.wt = start - p.at
-            time += p.bt
-            finish = time
-            p.tat = p.wt + p.bt
-            timeline.append((p.pid, start, finish))
-        return CPUScheduler._make_response(procs, timeline)
+        tbl = ProcessTable.from_processes(processes)
+        tbl = tbl.take(np.argsort(tbl.at, kind="stable"))
+        start, finish, wt, tat = CPUScheduler._fcfs_arrays(tbl)
+        timeline = zip(tbl.pid.tolist(), start.tolist(), finish.tolist())
+        return CPUScheduler._make_response(tbl, wt, tat, timeline)
 
-    # SJF Non-preemptive
+    # Non-preemptive engine shared by SJF and Priority
+    # Arrivals are sorted once and pushed into a min-heap keyed on (key, index),
+    # so ties still go to the process listed first. Idle gaps jump straight to
+    # the next arrival.
     @staticmethod
-    def sjf(processes):
-        procs = deepcopy(processes)
-        n = len(procs)
+    def _non_preemptive_events(tbl, keys):
+        pids = tbl.pid.tolist()
+        at = tbl.at.tolist()
+        bt = tbl.bt.tolist()
+        keys = keys.tolist()
+        n = len(at)
+        order = sorted(range(n), key=at.__getitem__)
+        heap = []
         time = 0
-        done = [False] * n
-        completed = 0
-        timeline = []
+        k = 0
 
-        while completed < n:
-            ready = [
-                i for i, p in enumerate(procs) if p.at <= time and not done[i]
-            ]
-            if not ready:
-                time += 1
+        while k < n or heap:
+            while k < n and at[order[k]] <= time:
+                i = order[k]
+                heapq.heappush(heap, (keys[i], i))
+                k += 1
+            if not heap:
+                time = at[order[k]]
                 continue
 
-            idx = min(ready, key=lambda i: procs[i].bt)
-            p = procs[idx]
+            _, idx = heapq.heappop(heap)
             start = time
-            p.wt = start - p.at
-            time += p.bt
-            finish = time
-            p.tat = p.wt + p.bt
-            done[idx] = True
-            completed += 1
-            timeline.append((p.pid, start, finish))
+            wt = start - at[idx]
+            time += bt[idx]
+            yield ("segment", pids[idx], start, time)
+            yield ("complete", idx, pids[idx], wt, wt + bt[idx])
 
-        return CPUScheduler._make_response(procs, timeline)
+    # SJF Non-preemptive
+    @staticmethod
+    def sjf(processes):
+        return CPUScheduler._collect(CPUScheduler.stream(processes, "sjf"))
 
-    # SJF Preemptive
+    # Preemptive engine shared by SRTF and Priority (Preemptive)
+    # Event-driven: the CPU only re-decides on an arrival or a completion.
+    # The running process is pushed back with its updated key, so the heap
+    # always holds (key, index) for every ready process.
     @staticmethod
-    def sjf_preemptive(processes):
-        procs = deepcopy(processes)
-        n = len(procs)
-        remaining = [p.bt for p in procs]
+    def _preemptive_events(tbl, by_remaining):
+        pids = tbl.pid.tolist()
+        at = tbl.at.tolist()
+        bt = tbl.bt.tolist()
+        prio = tbl.priority.tolist()
+        n = len(at)
+        order = sorted(range(n), key=at.__getitem__)
+        remaining = list(bt)
+        heap = []
         time = 0
-        completed = 0
+        k = 0
         last = None
         start_t = 0
-        timeline = []
 
-        while completed < n:
-            ready = [
-                i for i, p in enumerate(procs)
-                if p.at <= time and remaining[i] > 0
-            ]
-            if not ready:
-                time += 1
+        while k < n or heap:
+            while k < n and at[order[k]] <= time:
+                i = order[k]
+                key = remaining[i] if by_remaining else prio[i]
+                heapq.heappush(heap, (key, i))
+                k += 1
+            if not heap:
+                time = at[order[k]]
                 continue
 
-            idx = min(ready, key=lambda i: remaining[i])
-            p = procs[idx]
+            _, idx = heapq.heappop(heap)
+            pid = pids[idx]
 
-            if last != p.pid:
+            if last != pid:
                 if last is not None:
-                    timeline.append((last, start_t, time))
-                last = p.pid
+                    yield ("segment", last, start_t, time)
+                last = pid
                 start_t = time
 
-            remaining[idx] -= 1
-            time += 1
-
-            if remaining[idx] == 0:
-                completed += 1
-                p.tat = time - p.at
-                p.wt = p.tat - p.bt
+            finish = time + remaining[idx]
+            if k < n and at[order[k]] < finish:
+                # Run until the next arrival, then let the heap decide again
+                nxt = at[order[k]]
+                remaining[idx] -= nxt - time
+                time = nxt
+                key = remaining[idx] if by_remaining else prio[idx]
+                heapq.heappush(heap, (key, idx))
+            else:
+                time = finish
+                remaining[idx] = 0
+                tat = time - at[idx]
+                yield ("complete", idx, pid, tat - bt[idx], tat)
 
         if last is not None:
-            timeline.append((last, start_t, time))
+            yield ("segment", last, start_t, time)
 
-        return CPUScheduler._make_response(procs, timeline)
+    # SJF Preemptive
+    @staticmethod
+    def sjf_preemptive(processes):
+        return CPUScheduler._collect(CPUScheduler.stream(processes, "sjf_preemptive"))
 
     # Priority Non-preemptive
     @staticmethod
     def priority(processes):
-        procs = deepcopy(processes)
-        n = len(procs)
-        time = 0
-        done = [False] * n
-        completed = 0
-        timeline = []
+        return CPUScheduler._collect(CPUScheduler.stream(processes, "priority"))
 
-        while completed < n:
-            ready = [
-                i for i, p in enumerate(procs)
-                if p.at <= time and not done[i]
-            ]
-            if not ready:
-                time += 1
-                continue
-
-            idx = min(ready, key=lambda i: procs[i].priority)
-            p = procs[idx]
-            start = time
-            p.wt = start - p.at
-            time += p.bt
-            finish = time
-            p.tat = p.wt + p.bt
-            done[idx] = True
-            completed += 1
-            timeline.append((p.pid, start, finish))
+    # Priority Preemptive
+    # aging=r lowers a waiting process's priority number by one for every r
+    # ticks it waits, but never below aging_cap (default: the best base
+    # priority in the input, so a starving process can catch up with the
+    # top class but not overtake it). The earned priority is kept while the
+    # process runs; if it is preempted it starts over from its base priority.
+    @staticmethod
+    def priority_preemptive(processes, aging=None, aging_cap=None):
+        return CPUScheduler._collect(
+            CPUScheduler.stream(
+                processes, "priority_preemptive", aging=aging, aging_cap=aging_cap
+            )
+        )
 
-        return CPUScheduler._make_response(procs, timeline)
+    @staticmethod
+    def _aging_events(tbl, aging=None, aging_cap=None):
+        if aging is None:
+            return CPUScheduler._preemptive_events(tbl, False)
+        if aging <= 0:
+            raise ValueError("aging must be > 0")
+        if aging_cap is None:
+            aging_cap = int(tbl.priority.min()) if len(tbl) else 0
+        return CPUScheduler._aging_loop(tbl, aging, aging_cap)
 
-    # Priority Preemptive
+    # Ready processes sit in an indexed heap keyed on priority * n + index
+    # (same order as (priority, index), but a single int compare); aging
+    # lowers a key in place with decrease_key.
+    # Each waiting process has one pending aging tick. Every tick is
+    # scheduled exactly `rate` after an event that is already in time
+    # order, so the pending ticks form a FIFO and need no heap. Ticks due
+    # up to the next arrival or completion are fired in one inner loop;
+    # only a tick that lifts a process above the running one ends it early
+    # (a preemption at that tick's time).
     @staticmethod
-    def priority_preemptive(processes):
-        procs = deepcopy(processes)
-        n = len(procs)
-        remaining = [p.bt for p in procs]
+    def _aging_loop(tbl, rate, cap):
+        pids = tbl.pid.tolist()
+        at = tbl.at.tolist()
+        bt = tbl.bt.tolist()
+        prio = tbl.priority.tolist()
+        n = len(at)
+        order = sorted(range(n), key=at.__getitem__)
+        remaining = list(bt)
+        ready = _IndexedHeap(n)
+        heap = ready.heap
+        key = ready.key
+        push = ready.push
+        pop = ready.pop
+        decrease_key = ready.decrease_key
+        # A tick lowers key[i] by exactly n; the process keeps aging while
+        # its priority is above cap, i.e. while key[i] >= floor
+        floor = (cap + 1) * n
+        # stint[i] changes whenever i enters or leaves the ready heap, which
+        # invalidates any tick still queued for it
+        stint = [0] * n
+        ticks = deque()
+        popleft = ticks.popleft
+        append = ticks.append
+        appendleft = ticks.appendleft
         time = 0
-        completed = 0
+        k = 0
+        cur = -1
+        cur_key = 0
+        run_from = 0
         last = None
-        st = 0
-        timeline = []
+        start_t = 0
 
-        while completed < n:
-            ready = [
-                i for i, p in enumerate(procs)
-                if p.at <= time and remaining[i] > 0
-            ]
-            if not ready:
-                time += 1
-                continue
+        while k < n or cur >= 0:
+            # Next arrival or completion of the running job
+            nxt = at[order[k]] if k < n else None
+            if cur >= 0:
+                done = run_from + remaining[cur]
+                if nxt is None or done <= nxt:
+                    nxt = done
 
-            idx = min(ready, key=lambda i: procs[i].priority)
-            p = procs[idx]
+            # Fire ticks due up to nxt. A live tick implies a ready
+            # process, and so a running one (cur >= 0).
+            while ticks:
+                t, i, s = popleft()
+                if stint[i] != s:
+                    continue
+                if t > nxt:
+                    appendleft((t, i, s))
+                    break
+                kk = key[i] - n
+                decrease_key(i, kk)
+                if kk >= floor:
+                    append((t + rate, i, s))
+                if kk < cur_key:
+                    # Preempts at t, after the other ticks due at t
+                    nxt = t
 
-            if last != p.pid:
-                if last is not None:
-                    timeline.append((last, st, time))
-                last = p.pid
-                st = time
+            if nxt is None:
+                break
+            if nxt > time:
+                time = nxt
 
-            remaining[idx] -= 1
-            time += 1
+            if cur >= 0:
+                remaining[cur] -= time - run_from
+                run_from = time
+                if remaining[cur] == 0:
+                    tat = time - at[cur]
+                    yield ("complete", cur, pids[cur], tat - bt[cur], tat)
+                    cur = -1
 
-            if remaining[idx] == 0:
-                completed += 1
-                p.tat = time - p.at
-                p.wt = p.tat - p.bt
+            while k < n and at[order[k]] <= time:
+                i = order[k]
+                k += 1
+                stint[i] += 1
+                push(i, prio[i] * n + i)
+                if prio[i] > cap:
+                    append((time + rate, i, stint[i]))
 
-        if last is not None:
-            timeline.append((last, st, time))
+            if cur >= 0 and heap and key[heap[0]] < cur_key:
+                stint[cur] += 1
+                push(cur, prio[cur] * n + cur)
+                if prio[cur] > cap:
+                    append((time + rate, cur, stint[cur]))
+                cur = -1
+            if cur < 0 and heap:
+                cur_key, cur = pop()
+                stint[cur] += 1
+                run_from = time
+                if last != pids[cur]:
+                    if last is not None:
+                        yield ("segment", last, start_t, time)
+                    last = pids[cur]
+                    start_t = time
 
-        return CPUScheduler._make_response(procs, timeline)
+        if last is not None:
+            yield ("segment", last, start_t, time)
 
     # Round Robin
+    # While the queue is stable (no completion and no arrival due) every
+    # rotation is identical, so k rotations are applied at once:
+    #   k = min over the queue of (remaining - 1) // quantum, further capped
+    #   so the last slice ends before the next arrival.
+    # The check costs O(queue) and runs at most once per rotation. With
+    # compress=True the k rotations come out as one "rounds" record.
     @staticmethod
-    def round_robin(processes, quantum):
-        procs = deepcopy(processes)
-        procs.sort(key=lambda p: p.at)
-        n = len(procs)
+    def _round_robin_events(tbl, quantum, compress=False):
+        pids = tbl.pid.tolist()
+        at = tbl.at.tolist()
+        bt = tbl.bt.tolist()
+        n = len(at)
 
         time = 0
-        remaining = [p.bt for p in procs]
-        tat = [0] * n
-        wt = [0] * n
-        completed = [False] * n
+        remaining = list(bt)
         queue = deque()
-        timeline = []
         i = 0
 
-        while i < n and procs[i].at <= time:
+        while i < n and at[i] <= time:
             queue.append(i)
             i += 1
 
         if not queue and i < n:
-            time = procs[i].at
+            time = at[i]
             queue.append(i)
             i += 1
 
+        since_check = len(queue)
+
         while queue:
+            m = len(queue)
+            if since_check >= m:
+                since_check = 0
+                k = min(remaining[j] for j in queue) - 1
+                k //= quantum
+                if i < n:
+                    k = min(k, (at[i] - time - 1) // (m * quantum))
+                if k > 0:
+                    for j in queue:
+                        remaining[j] -= k * quantum
+                    if compress:
+                        yield ("rounds", tuple(pids[j] for j in queue), time, quantum, k)
+                        time += k * m * quantum
+                    else:
+                        for _ in range(k):
+                            for j in queue:
+                                yield ("segment", pids[j], time, time + quantum)
+                                time += quantum
+            since_check += 1
+
             idx = queue.popleft()
-            p = procs[idx]
             start = time
+            done = False
 
             if remaining[idx] > quantum:
                 time += quantum
                 remaining[idx] -= quantum
             else:
                 time += remaining[idx]
-                tat[idx] = time - p.at
-                wt[idx] = tat[idx] - p.bt
                 remaining[idx] = 0
-                completed[idx] = True
+                done = True
 
-            timeline.append((p.pid, start, time))
+            yield ("segment", pids[idx], start, time)
+            if done:
+                tat = time - at[idx]
+                yield ("complete", idx, pids[idx], tat - bt[idx], tat)
 
-            while i < n and procs[i].at <= time:
+            while i < n and at[i] <= time:
                 queue.append(i)
                 i += 1
 
-            if not completed[idx]:
+            if not done:
                 queue.append(idx)
 
             if not queue and i < n:
-                time = procs[i].at
+                time = at[i]
                 queue.append(i)
                 i += 1
 
-        for j in range(n):
-            procs[j].wt = wt[j]
-            procs[j].tat = tat[j]
+    @staticmethod
+    def round_robin(processes, quantum, compress=False):
+        return CPUScheduler._collect(
+            CPUScheduler.stream(processes, "round_robin", quantum, compress)
+        )
+
+    # Completely Fair Scheduler (CFS-style)
+    # Priority is read as a nice value (-20..19) and mapped to the kernel's
+    # load weights. The runnable process with the smallest virtual runtime
+    # runs for max(min_granularity, latency * weight / total weight) ticks,
+    # or until it finishes; its vruntime then grows by ran * 1024 / weight.
+    # New arrivals start at the current min vruntime. Only slice ends,
+    # completions and arrivals are simulated, never single ticks.
+    @staticmethod
+    def _cfs_events(tbl, latency=12, min_granularity=2):
+        if latency <= 0 or min_granularity <= 0:
+            raise ValueError("latency and min_granularity must be > 0")
+        return CPUScheduler._cfs_loop(tbl, latency, min_granularity)
+
+    @staticmethod
+    def _cfs_loop(tbl, latency, min_granularity):
+        pids = tbl.pid.tolist()
+        at = tbl.at.tolist()
+        bt = tbl.bt.tolist()
+        weight = [_NICE_WEIGHTS[min(max(p, -20), 19) + 20] for p in tbl.priority.tolist()]
+        n = len(at)
+        order = sorted(range(n), key=at.__getitem__)
+        remaining = list(bt)
+        vruntime = [0.0] * n
+        min_v = 0.0
+        total_w = 0
+        heap = []
+        time = 0
+        k = 0
+        last = None
+        seg_start = 0
+        seg_end = 0
+
+        while k < n or heap:
+            while k < n and at[order[k]] <= time:
+                i = order[k]
+                vruntime[i] = min_v
+                heapq.heappush(heap, (min_v, i))
+                total_w += weight[i]
+                k += 1
+            if not heap:
+                time = at[order[k]]
+                continue
+
+            _, idx = heapq.heappop(heap)
+            if last != idx or seg_end != time:
+                if last is not None:
+                    yield ("segment", pids[last], seg_start, seg_end)
+                last = idx
+                seg_start = time
+
+            run = -(-latency * weight[idx] // total_w)
+            if run < min_granularity:
+                run = min_granularity
+            if run > remaining[idx]:
+                run = remaining[idx]
+            remaining[idx] -= run
+            vruntime[idx] += run * 1024 / weight[idx]
+            time += run
+            seg_end = time
+
+            # Arrivals during the slice queue up before it is re-inserted
+            while k < n and at[order[k]] <= time:
+                i = order[k]
+                vruntime[i] = min_v
+                heapq.heappush(heap, (min_v, i))
+                total_w += weight[i]
+                k += 1
+
+            if remaining[idx] == 0:
+                total_w -= weight[idx]
+                tat = time - at[idx]
+                yield ("complete", idx, pids[idx], tat - bt[idx], tat)
+            else:
+                heapq.heappush(heap, (vruntime[idx], idx))
+            if heap and heap[0][0] > min_v:
+                min_v = heap[0][0]
+
+        if last is not None:
+            yield ("segment", pids[last], seg_start, seg_end)
+
+    @staticmethod
+    def cfs(processes, latency=12, min_granularity=2):
+        return CPUScheduler._collect(
+            CPUScheduler.stream(
+                processes, "cfs", latency=latency, min_granularity=min_granularity
+            )
+        )
+
+    # Multi-level feedback queue
+    # quanta[l] is the time allotment at level l (None on the last level
+    # means run to completion). New arrivals enter level 0 and preempt
+    # anything running below it; using up the allotment drops a process one
+    # level. Every `boost` ticks all processes go back to level 0. A boost
+    # bumps an epoch counter instead of touching each process: a stale
+    # epoch reads as level 0 with a fresh allotment.
+    @staticmethod
+    def _mlfq_events(tbl, quanta=(2, 4, 8), boost=None):
+        quanta = list(quanta)
+        if not quanta:
+            raise ValueError("MLFQ needs at least one level.")
+        for q in quanta[:-1]:
+            if q is None or q <= 0:
+                raise ValueError("Quantum must be > 0.")
+        if quanta[-1] is not None and quanta[-1] <= 0:
+            raise ValueError("Quantum must be > 0.")
+        if boost is not None and boost <= 0:
+            raise ValueError("boost must be > 0")
+        return CPUScheduler._mlfq_loop(tbl, quanta, boost)
+
+    @staticmethod
+    def _mlfq_loop(tbl, quanta, boost):
+        pids = tbl.pid.tolist()
+        at = tbl.at.tolist()
+        bt = tbl.bt.tolist()
+        n = len(at)
+        order = sorted(range(n), key=at.__getitem__)
+        levels = len(quanta)
+        queues = [deque() for _ in range(levels)]
+        level = [0] * n
+        used = [0] * n
+        stamp = [0] * n
+        remaining = list(bt)
+        epoch = 0
+        next_boost = boost
+        waiting = 0
+        time = 0
+        k = 0
+        cur = -1
+        seg_start = 0
+
+        while k < n or waiting or cur >= 0:
+            while k < n and at[order[k]] <= time:
+                i = order[k]
+                stamp[i] = epoch
+                level[i] = 0
+                used[i] = 0
+                queues[0].append(i)
+                waiting += 1
+                k += 1
+
+            if boost is not None and time >= next_boost:
+                epoch += 1
+                for lv in range(1, levels):
+                    queues[0].extend(queues[lv])
+                    queues[lv].clear()
+                next_boost = (time // boost + 1) * boost
+
+            if cur >= 0 and stamp[cur] != epoch:
+                stamp[cur] = epoch
+                level[cur] = 0
+                used[cur] = 0
+
+            # Preempt if something is waiting on a higher level
+            if cur >= 0 and waiting:
+                for lv in range(level[cur]):
+                    if queues[lv]:
+                        yield ("segment", pids[cur], seg_start, time)
+                        queues[level[cur]].append(cur)
+                        waiting += 1
+                        cur = -1
+                        break
+
+            if cur < 0:
+                if not waiting:
+                    time = at[order[k]]
+                    continue
+                for lv in range(levels):
+                    if queues[lv]:
+                        cur = queues[lv].popleft()
+                        break
+                waiting -= 1
+                if stamp[cur] != epoch:
+                    stamp[cur] = epoch
+                    level[cur] = 0
+                    used[cur] = 0
+                seg_start = time
+
+            lv = level[cur]
+            q = quanta[lv]
+            end = time + remaining[cur]
+            if q is not None and time + q - used[cur] < end:
+                end = time + q - used[cur]
+            if lv > 0 and k < n and at[order[k]] < end:
+                end = at[order[k]]
+            if boost is not None and next_boost < end:
+                end = next_boost
+
+            ran = end - time
+            remaining[cur] -= ran
+            used[cur] += ran
+            time = end
+
+            # Arrivals during the slice queue up before a demoted process
+            while k < n and at[order[k]] <= time:
+                i = order[k]
+                stamp[i] = epoch
+                level[i] = 0
+                used[i] = 0
+                queues[0].append(i)
+                waiting += 1
+                k += 1
+
+            if remaining[cur] == 0:
+                yield ("segment", pids[cur], seg_start, time)
+                tat = time - at[cur]
+                yield ("complete", cur, pids[cur], tat - bt[cur], tat)
+                cur = -1
+            elif q is not None and used[cur] == q:
+                yield ("segment", pids[cur], seg_start, time)
+                if lv + 1 < levels:
+                    level[cur] = lv + 1
+                used[cur] = 0
+                queues[level[cur]].append(cur)
+                waiting += 1
+                cur = -1
+
+    @staticmethod
+    def mlfq(processes, quanta=(2, 4, 8), boost=None):
+        return CPUScheduler._collect(
+            CPUScheduler.stream(processes, "mlfq", quanta=quanta, boost=boost)
+        )
+
+    # Multi-core (SMP) simulation
+    # Runs any of the six policies on `cores` CPUs. Each core has its own
+    # ready heaps: one for processes pinned to it through `affinity` and one
+    # for processes any core may run. FCFS and Round Robin key their heaps
+    # on an enqueue counter, so they behave as FIFO queues.
+    #
+    # - An arrival goes to its pinned core, else to the lowest idle core,
+    #   else to the core with the shortest ready queue.
+    # - With steal=True an idle core takes the best unpinned process from
+    #   the core with the longest unpinned queue.
+    # - Preemptive policies preempt on the core the arrival was placed on.
+    #
+    # Core loads live in lazy heaps, so every event costs O(log n + log cores).
+    # Returns the _make_response shape for all processes (table rows carry
+    # the core they finished on, timeline segments the core they ran on)
+    # plus "cores": one _make_response dict per core.
+    @staticmethod
+    def smp(processes, algo, cores, quantum=None, affinity=None, steal=True):
+        algo = algo.lower()
+        if algo not in (
+            "fcfs", "sjf", "sjf_preemptive", "priority",
+            "priority_preemptive", "round_robin",
+        ):
+            raise ValueError("Unknown algorithm.")
+        if cores <= 0:
+            raise ValueError("cores must be > 0")
+        rr = algo == "round_robin"
+        if rr and (quantum is None or quantum <= 0):
+            raise ValueError("Quantum must be > 0.")
+
+        tbl = ProcessTable.from_processes(processes)
+        n = len(tbl)
+        if affinity is None:
+            aff = [-1] * n
+        else:
+            aff = [-1 if a is None else int(a) for a in affinity]
+            if len(aff) != n:
+                raise ValueError("affinity must have one entry per process.")
+            if any(a >= cores for a in aff):
+                raise ValueError("affinity core out of range.")
+        if algo in ("fcfs", "round_robin"):
+            order = np.argsort(tbl.at, kind="stable")
+            tbl = tbl.take(order)
+            aff = [aff[j] for j in order.tolist()]
+
+        pids = tbl.pid.tolist()
+        at = tbl.at.tolist()
+        bt = tbl.bt.tolist()
+        prio = tbl.priority.tolist()
+        arrivals = sorted(range(n), key=at.__getitem__)
+        remaining = list(bt)
+        wt = [0] * n
+        tat = [0] * n
+        done_on = [0] * n
+
+        preemptive = algo in ("sjf_preemptive", "priority_preemptive")
+        by_seq = algo in ("fcfs", "round_robin")
+        seq = 0
+
+        pinned = [[] for _ in range(cores)]
+        shared = [[] for _ in range(cores)]
+        qlen = [0] * cores
+        slen = [0] * cores
+        unpinned = 0
+        shortest = [(0, c) for c in range(cores)]
+        longest = []
+        idle = list(range(cores))
+        in_idle = [True] * cores
+        running = [-1] * cores
+        run_start = [0] * cores
+        token = [0] * cores
+        ends = []
+        timelines = [[] for _ in range(cores)]
+        segments = []
+
+        def key_of(i):
+            if by_seq:
+                return seq
+            if algo == "sjf":
+                return bt[i]
+            if algo == "sjf_preemptive":
+                return remaining[i]
+            return prio[i]
+
+        def enqueue(c, i):
+            nonlocal seq, shortest, longest, unpinned
+            seq += 1
+            if aff[i] >= 0:
+                heapq.heappush(pinned[c], (key_of(i), i))
+            else:
+                heapq.heappush(shared[c], (key_of(i), i))
+                slen[c] += 1
+                unpinned += 1
+                heapq.heappush(longest, (-slen[c], c))
+            qlen[c] += 1
+            heapq.heappush(shortest, (qlen[c], c))
+            # Drop stale load entries once they outnumber the live ones
+            if len(shortest) > 4 * cores + 64:
+                shortest = [(qlen[x], x) for x in range(cores)]
+                heapq.heapify(shortest)
+            if len(longest) > 4 * cores + 64:
+                longest = [(-slen[x], x) for x in range(cores) if slen[x]]
+                heapq.heapify(longest)
+
+        def best(c):
+            p = pinned[c]
+            s = shared[c]
+            if s and (not p or s[0] < p[0]):
+                return s
+            return p
+
+        def dequeue(c):
+            nonlocal unpinned
+            h = best(c)
+            _, i = heapq.heappop(h)
+            if h is shared[c]:
+                slen[c] -= 1
+                unpinned -= 1
+                heapq.heappush(longest, (-slen[c], c))
+            qlen[c] -= 1
+            heapq.heappush(shortest, (qlen[c], c))
+            return i
+
+        def steal_into(c):
+            nonlocal unpinned
+            while longest:
+                load, v = longest[0]
+                if -load != slen[v] or not slen[v] or v == c:
+                    heapq.heappop(longest)
+                    continue
+                _, i = heapq.heappop(shared[v])
+                slen[v] -= 1
+                unpinned -= 1
+                qlen[v] -= 1
+                heapq.heappush(longest, (-slen[v], v))
+                heapq.heappush(shortest, (qlen[v], v))
+                return i
+            return -1
+
+        def start(c, i, t):
+            running[c] = i
+            run_start[c] = t
+            token[c] += 1
+            run = remaining[i]
+            if rr and run > quantum:
+                run = quantum
+            heapq.heappush(ends, (t + run, c, token[c]))
+
+        def stop(c, t):
+            i = running[c]
+            remaining[i] -= t - run_start[c]
+            running[c] = -1
+            token[c] += 1
+            timelines[c].append((pids[i], run_start[c], t))
+            segments.append((pids[i], run_start[c], t, c))
+            return i
+
+        k = 0
+        finished = 0
+        while finished < n:
+            while ends and ends[0][2] != token[ends[0][1]]:
+                heapq.heappop(ends)
+            if ends and (k == n or ends[0][0] <= at[arrivals[k]]):
+                time = ends[0][0]
+            else:
+                time = at[arrivals[k]]
+
+            dirty = []
+            held = []
+            # 1) completions and RR slice ends
+            while ends and ends[0][0] == time:
+                _, c, tok = heapq.heappop(ends)
+                if tok != token[c]:
+                    continue
+                i = stop(c, time)
+                dirty.append(c)
+                if remaining[i] == 0:
+                    tat[i] = time - at[i]
+                    wt[i] = tat[i] - bt[i]
+                    done_on[i] = c
+                    finished += 1
+                else:
+                    held.append((c, i))
+
+            # 2) arrivals, queued before any RR re-append as on one CPU
+            while k < n and at[arrivals[k]] <= time:
+                i = arrivals[k]
+                k += 1
+                c = aff[i]
+                while c < 0 and idle:
+                    x = heapq.heappop(idle)
+                    in_idle[x] = False
+                    if running[x] < 0 and not qlen[x]:
+                        c = x
+                if c < 0:
+                    while shortest[0][0] != qlen[shortest[0][1]]:
+                        heapq.heappop(shortest)
+                    c = shortest[0][1]
+                enqueue(c, i)
+                dirty.append(c)
+
+            # 3) RR slices go to the back of the queue they ran from
+            for c, i in held:
+                enqueue(c, i)
+
+            # 4) dispatch, or preempt, on every core touched above
+            for c in dirty:
+                i = running[c]
+                if i >= 0:
+                    if not preemptive or not qlen[c]:
+                        continue
+                    if algo == "sjf_preemptive":
+                        cur = (remaining[i] - (time - run_start[c]), i)
+                    else:
+                        cur = (prio[i], i)
+                    if not best(c)[0] < cur:
+                        continue
+                    enqueue(c, stop(c, time))
+                if qlen[c]:
+                    start(c, dequeue(c), time)
+                elif steal and unpinned:
+                    i = steal_into(c)
+                    if i >= 0:
+                        start(c, i, time)
+                if running[c] < 0 and not in_idle[c]:
+                    in_idle[c] = True
+                    heapq.heappush(idle, c)
+
+            # 5) idle cores steal whatever unpinned work is still queued
+            while steal and idle and unpinned:
+                x = idle[0]
+                if running[x] >= 0 or qlen[x]:
+                    heapq.heappop(idle)
+                    in_idle[x] = False
+                    continue
+                i = steal_into(x)
+                if i < 0:
+                    break
+                heapq.heappop(idle)
+                in_idle[x] = False
+                start(x, i, time)
+
+        res = CPUScheduler._make_response(tbl, wt, tat, [])
+        for row, c in zip(res["table"], done_on):
+            row["core"] = c
+        res["timeline"] = [
+            {"pid": pid, "start": st, "finish": ft, "core": c}
+            for (pid, st, ft, c) in segments
+        ]
+
+        rows = [[] for _ in range(cores)]
+        for i, c in enumerate(done_on):
+            rows[c].append(i)
+        per_core = []
+        for c in range(cores):
+            sub = CPUScheduler._make_response(
+                tbl.take(np.asarray(rows[c], dtype=np.int64)),
+                [wt[i] for i in rows[c]],
+                [tat[i] for i in rows[c]],
+                timelines[c],
+            )
+            sub["core"] = c
+            per_core.append(sub)
+        res["cores"] = per_core
+        return res
+
+    # Quantum sweep
+    # The arrival-sorted table is built once and shipped to each worker
+    # once (via the pool initializer), so a task is just a quantum.
+    # Returns one {"quantum", "avg_wt", "avg_tat"} dict per quantum, in the
+    # order given; full=True also attaches the usual response as "result".
+    @staticmethod
+    def round_robin_sweep(processes, quanta, full=False, workers=None):
+        quanta = list(quanta)
+        for q in quanta:
+            if q <= 0:
+                raise ValueError("Quantum must be > 0.")
+
+        tbl = ProcessTable.from_processes(processes)
+        tbl = tbl.take(np.argsort(tbl.at, kind="stable"))
+        cols = (tbl.pid, tbl.at, tbl.bt, tbl.priority)
+
+        if workers == 1 or len(quanta) <= 1:
+            _sweep_init(*cols)
+            return [_sweep_quantum(q, full) for q in quanta]
+
+        with ProcessPoolExecutor(
+            max_workers=workers, initializer=_sweep_init, initargs=cols
+        ) as pool:
+            return list(pool.map(_sweep_quantum, quanta, [full] * len(quanta)))
+
+
+# Per-worker state for CPUScheduler.round_robin_sweep
+_sweep_table = None
+
+
+def _sweep_init(pid, at, bt, priority):
+    global _sweep_table
+    _sweep_table = ProcessTable(pid, at, bt, priority)
+
 
-        return CPUScheduler._make_response(procs, timeline)
+def _sweep_quantum(quantum, full):
+    tbl = _sweep_table
+    stream = ScheduleStream(tbl, CPUScheduler._round_robin_events(tbl, quantum))
+    row = {"quantum": quantum}
+    if full:
+        res = CPUScheduler._collect(stream)
+        row["avg_wt"] = res["avg_wt"]
+        row["avg_tat"] = res["avg_tat"]
+        row["result"] = res
+    else:
+        # Averages only: drain the stream without keeping the timeline
+        for _ in stream:
+            pass
+        row["avg_wt"] = stream.avg_wt
+        row["avg_tat"] = stream.avg_tat
+    return row
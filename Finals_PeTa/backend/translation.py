@@ -0,0 +1,362 @@
+# Address Translation (TLB, multi-level / inverted page tables)
+from array import array
+import heapq
+import random
+
+import numpy as np
+
+from backend.paging import PageReplacement, TraceFile
+
+
+class _OptimalPlan:
+    # Offline Optimal for AddressTranslator: same access() contract as the
+    # OnlinePager classes, but driven by the precomputed next use of each
+    # reference in the (run-collapsed) page sequence.
+    def __init__(self, frames, next_use):
+        self.frames = frames
+        self.next_use = next_use
+        self.t = 0
+        self._next = {}
+        self._heap = []
+
+    def access(self, page):
+        nu = self.next_use[self.t]
+        self.t += 1
+        hit = page in self._next
+        evicted = None
+        if not hit and len(self._next) == self.frames:
+            while True:
+                neg, victim = heapq.heappop(self._heap)
+                if self._next.get(victim) == -neg:
+                    break
+            del self._next[victim]
+            evicted = victim
+        self._next[page] = nu
+        heapq.heappush(self._heap, (-nu, page))
+        if len(self._heap) > 2 * self.frames + 64:
+            self._heap = [(-n, p) for p, n in self._next.items()]
+            heapq.heapify(self._heap)
+        return hit, evicted
+
+
+class AddressTranslator:
+    # Translates virtual addresses through a set-associative TLB and, on a
+    # TLB miss, a page-table walk; page faults go to a frame replacement
+    # policy (any PageReplacement.online policy, or OPTIMAL).
+    #
+    # Page tables are flat arrays, not nested dicts:
+    #   multi-level  one array('q') per level; node i of a level owns the
+    #                2**bits entries starting at i * 2**bits, holding the
+    #                child node (or, at the last level, the frame), -1 if
+    #                absent. A walk costs one reference per level visited.
+    #   inverted     one entry per frame (its vpn), hashed through an
+    #                anchor table with chains; the frame is the entry's
+    #                index. A walk costs one reference per chain probe.
+    # The TLB is three flat lists (tag, frame, stamp) of sets * ways.
+    #
+    # run() is batched with NumPy: page numbers are computed per chunk and
+    # repeated references to the same page are collapsed where the frame
+    # policy ignores them. A repeat is always a TLB hit, and for most
+    # policies a no-op; ARC moves a page from T1 to T2 on its second
+    # reference, so it keeps two per run, and LFU counts every reference,
+    # so nothing is merged for it. Only the kept references go through
+    # the Python loop.
+    TLB_POLICIES = ("LRU", "FIFO", "RANDOM")
+    CHUNK = 1 << 20
+    # References per run that reach the pager (None: all of them)
+    RUN_LIMIT = {"ARC": 2, "LFU": None}
+
+    def __init__(self, frames, page_size=4096, va_bits=32, levels=(10, 10),
+                 inverted=False, tlb_sets=16, tlb_ways=4, tlb_policy="LRU",
+                 policy="LRU", window=1000, seed=None):
+        if frames <= 0:
+            raise ValueError("num_frames must be > 0")
+        if page_size <= 0 or page_size & (page_size - 1):
+            raise ValueError("page_size must be a power of two")
+        if tlb_sets <= 0 or tlb_ways <= 0:
+            raise ValueError("TLB sets and ways must be > 0")
+        tlb_policy = tlb_policy.upper()
+        if tlb_policy not in AddressTranslator.TLB_POLICIES:
+            raise ValueError("Unknown TLB policy.")
+
+        self.frames = frames
+        self.offset_bits = page_size.bit_length() - 1
+        self.vpn_bits = va_bits - self.offset_bits
+        self.inverted = inverted
+        self.tlb_sets = tlb_sets
+        self.tlb_ways = tlb_ways
+        self.tlb_policy = tlb_policy
+        self.policy = policy.upper().replace("-", "_")
+        if self.vpn_bits <= 0:
+            raise ValueError("va_bits must exceed the page offset bits")
+
+        if self.policy == "OPTIMAL":
+            self._pager = None
+        else:
+            self._pager = PageReplacement.online(frames, self.policy, window)
+
+        if inverted:
+            buckets = 1
+            while buckets < 2 * frames:
+                buckets <<= 1
+            self._anchor = array("q", [-1]) * buckets
+            self._ipt_vpn = array("q", [-1]) * frames
+            self._ipt_next = array("q", [-1]) * frames
+        else:
+            if sum(levels) != self.vpn_bits or min(levels) <= 0:
+                raise ValueError("levels must split the %d vpn bits" % self.vpn_bits)
+            # (shift, mask, entries per node) for each level, root first
+            self._geom = []
+            shift = self.vpn_bits
+            for bits in levels:
+                shift -= bits
+                self._geom.append((shift, (1 << bits) - 1, 1 << bits))
+            self._tables = [array("q", [-1]) * size for _, _, size in self._geom]
+            self._nodes = [1] * len(levels)
+
+        size = tlb_sets * tlb_ways
+        self._tlb_tag = [-1] * size
+        self._tlb_frame = [-1] * size
+        self._tlb_stamp = [0] * size
+        self._tlb_hand = [0] * tlb_sets
+        self._rng = random.Random(seed)
+
+        self._next_frame = 0
+        self._last_vpn = None
+        self._run_len = 0
+        self._run_limit = AddressTranslator.RUN_LIMIT.get(self.policy, 1)
+        self._clock = 0
+        self.translations = 0
+        self.tlb_hits = 0
+        self.page_walks = 0
+        self.walk_refs = 0
+        self.page_faults = 0
+
+    # Page tables
+    def _walk(self, vpn):
+        if self.inverted:
+            i = self._anchor[self._hash(vpn)]
+            refs = 1
+            while i != -1 and self._ipt_vpn[i] != vpn:
+                i = self._ipt_next[i]
+                refs += 1
+            self.walk_refs += refs
+            return i
+        node = 0
+        for level, (shift, mask, size) in enumerate(self._geom):
+            node = self._tables[level][node * size + ((vpn >> shift) & mask)]
+            if node < 0:
+                self.walk_refs += level + 1
+                return -1
+        self.walk_refs += len(self._geom)
+        return node
+
+    def _hash(self, vpn):
+        return ((vpn * 0x9E3779B1) >> 7) & (len(self._anchor) - 1)
+
+    def _map(self, vpn, frame):
+        if self.inverted:
+            h = self._hash(vpn)
+            self._ipt_vpn[frame] = vpn
+            self._ipt_next[frame] = self._anchor[h]
+            self._anchor[h] = frame
+            return
+        node = 0
+        last = len(self._geom) - 1
+        for level, (shift, mask, size) in enumerate(self._geom):
+            slot = node * size + ((vpn >> shift) & mask)
+            table = self._tables[level]
+            if level == last:
+                table[slot] = frame
+                return
+            node = table[slot]
+            if node < 0:
+                # Allocate the child node at the end of the next level
+                node = self._nodes[level + 1]
+                self._nodes[level + 1] += 1
+                self._tables[level + 1].extend(array("q", [-1]) * self._geom[level + 1][2])
+                table[slot] = node
+
+    def _unmap(self, vpn):
+        if self.inverted:
+            h = self._hash(vpn)
+            prev = -1
+            i = self._anchor[h]
+            while self._ipt_vpn[i] != vpn:
+                prev = i
+                i = self._ipt_next[i]
+            if prev == -1:
+                self._anchor[h] = self._ipt_next[i]
+            else:
+                self._ipt_next[prev] = self._ipt_next[i]
+            self._ipt_vpn[i] = -1
+            return i
+        node = 0
+        last = len(self._geom) - 1
+        for level, (shift, mask, size) in enumerate(self._geom):
+            slot = node * size + ((vpn >> shift) & mask)
+            node = self._tables[level][slot]
+            if level == last:
+                self._tables[level][slot] = -1
+        return node
+
+    # TLB
+    def _tlb_invalidate(self, vpn):
+        base = (vpn % self.tlb_sets) * self.tlb_ways
+        seg = self._tlb_tag[base:base + self.tlb_ways]
+        if vpn in seg:
+            self._tlb_tag[base + seg.index(vpn)] = -1
+
+    def _tlb_fill(self, vpn, frame):
+        ways = self.tlb_ways
+        s = vpn % self.tlb_sets
+        base = s * ways
+        seg = self._tlb_tag[base:base + ways]
+        if -1 in seg:
+            w = base + seg.index(-1)
+        elif self.tlb_policy == "LRU":
+            stamps = self._tlb_stamp[base:base + ways]
+            w = base + stamps.index(min(stamps))
+        elif self.tlb_policy == "FIFO":
+            w = base + self._tlb_hand[s]
+            self._tlb_hand[s] = (self._tlb_hand[s] + 1) % ways
+        else:
+            w = base + self._rng.randrange(ways)
+        self._tlb_tag[w] = vpn
+        self._tlb_frame[w] = frame
+        self._tlb_stamp[w] = self._clock
+
+    # Batched translation
+    # addresses: a NumPy integer array, any sequence of ints, or a
+    # TraceFile of raw addresses (opened without page_size). Counters
+    # accumulate across calls, so a trace can be fed chunk by chunk;
+    # OPTIMAL needs the whole trace in a single call.
+    def run(self, addresses):
+        if isinstance(addresses, TraceFile):
+            data = np.frombuffer(addresses.view, dtype=addresses.dtype)
+        else:
+            data = np.asarray(addresses)
+        if data.dtype.kind not in "iu":
+            raise ValueError("addresses must be integers")
+
+        if self.policy == "OPTIMAL":
+            if self._pager is not None:
+                raise ValueError("OPTIMAL needs the whole trace in one run()")
+            heads = self._vpns(data)
+            self._pager = _OptimalPlan(self.frames, self._next_use(heads))
+
+        for start in range(0, len(data), AddressTranslator.CHUNK):
+            self._run_chunk(self._vpns(data[start:start + AddressTranslator.CHUNK]))
+        return self.stats()
+
+    def _vpns(self, chunk):
+        vpn = chunk >> chunk.dtype.type(self.offset_bits)
+        if len(vpn) and int(vpn.max()) >> self.vpn_bits:
+            raise ValueError("address wider than va_bits")
+        if len(vpn) and (chunk < 0).any():
+            raise ValueError("addresses must be >= 0")
+        return vpn
+
+    # Marks the references of vpn that are within the first `limit` of
+    # their run; last/carried continue a run from the previous chunk.
+    # Returns (mask, length of the trailing run).
+    @staticmethod
+    def _run_mask(vpn, last, carried, limit):
+        n = len(vpn)
+        change = np.ones(n, dtype=bool)
+        change[1:] = vpn[1:] != vpn[:-1]
+        if limit == 1:
+            if last is not None and int(vpn[0]) == last:
+                change[0] = False
+            return change, 1
+        idx = np.arange(n)
+        pos = idx - np.maximum.accumulate(np.where(change, idx, 0))
+        if last is not None and int(vpn[0]) == last:
+            first = np.flatnonzero(change[1:])
+            pos[:first[0] + 1 if len(first) else n] += carried
+        return pos < limit, int(pos[-1]) + 1
+
+    @staticmethod
+    def _next_use(heads):
+        # Collapse runs, then next occurrence of each head via a stable sort
+        keep, _ = AddressTranslator._run_mask(heads, None, 0, 1)
+        h = heads[keep]
+        order = np.argsort(h, kind="stable")
+        nxt = np.full(len(h), len(h), dtype=np.int64)
+        same = h[order[1:]] == h[order[:-1]]
+        nxt[order[:-1][same]] = order[1:][same]
+        return nxt.tolist()
+
+    def _run_chunk(self, vpn):
+        n = len(vpn)
+        if not n:
+            return
+        if self._run_limit is None:
+            heads = vpn.tolist()
+        else:
+            keep, run_len = AddressTranslator._run_mask(
+                vpn, self._last_vpn, self._run_len, self._run_limit
+            )
+            self._run_len = run_len
+            heads = vpn[keep].tolist()
+        self._last_vpn = int(vpn[-1])
+        self.translations += n
+        self.tlb_hits += n - len(heads)
+        if not heads:
+            return
+
+        access = self._pager.access
+        tags = self._tlb_tag
+        stamps = self._tlb_stamp
+        sets = self.tlb_sets
+        ways = self.tlb_ways
+        lru = self.tlb_policy == "LRU"
+        clock = self._clock
+        tlb_hits = 0
+
+        for vpn in heads:
+            clock += 1
+            resident, evicted = access(vpn)
+            base = (vpn % sets) * ways
+            seg = tags[base:base + ways]
+            if vpn in seg:
+                tlb_hits += 1
+                if lru:
+                    stamps[base + seg.index(vpn)] = clock
+                continue
+
+            self._clock = clock
+            self.page_walks += 1
+            frame = self._walk(vpn)
+            if not resident:
+                self.page_faults += 1
+                if evicted is not None:
+                    self._tlb_invalidate(evicted)
+                    frame = self._unmap(evicted)
+                else:
+                    frame = self._next_frame
+                    self._next_frame += 1
+                self._map(vpn, frame)
+            self._tlb_fill(vpn, frame)
+
+        self._clock = clock
+        self.tlb_hits += tlb_hits
+
+    def translate(self, address):
+        self.run(np.array([address], dtype=np.uint64))
+        vpn = address >> self.offset_bits
+        base = (vpn % self.tlb_sets) * self.tlb_ways
+        w = base + self._tlb_tag[base:base + self.tlb_ways].index(vpn)
+        return (self._tlb_frame[w] << self.offset_bits) | (address & ((1 << self.offset_bits) - 1))
+
+    def stats(self):
+        misses = self.translations - self.tlb_hits
+        return {
+            "translations": self.translations,
+            "tlb_hits": self.tlb_hits,
+            "tlb_misses": misses,
+            "tlb_hit_rate": self.tlb_hits / self.translations if self.translations else 0.0,
+            "page_walks": self.page_walks,
+            "walk_refs": self.walk_refs,
+            "page_faults": self.page_faults,
+        }
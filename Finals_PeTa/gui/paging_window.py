@@ -43,7 +43,7 @@ def open_page_replacement_window(parent):
     )
     algo_var = ctk.StringVar(value="FIFO")
     algo_menu = ctk.CTkOptionMenu(
-        controls, values=["FIFO", "LRU", "Optimal"],
+        controls, values=["FIFO", "LRU", "Optimal", "CLOCK", "Second-Chance", "LFU", "ARC", "2Q"],
         variable=algo_var, width=140
     )
     algo_menu.grid(row=2, column=1, padx=6, pady=6, sticky="w")